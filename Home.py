@@ -2,23 +2,31 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+import frame_cache
+import profiling
+from macro_panel import add_cross_section_stats, freeze, read_macro_csv
+from utils_ui import export_section
+
 st.set_page_config(
     page_title="Macroeconomic Overview",
     page_icon="📊",
     layout="wide",
 )
 
+profiling.profile_this_run()
+
 DATA_PATH = "data/macro_indicators_worldbank_2024.csv"
 
-@st.cache_data
+@frame_cache.cached
 def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    df = read_macro_csv(path)
     # basic sanity
     expected = {"country","iso3","year","gdp_growth_pct","inflation_cpi_pct","unemployment_pct"}
     missing = expected - set(df.columns)
     if missing:
         raise ValueError(f"CSV missing columns: {missing}")
-    return df
+    # rank / persentil / z-score per tahun dihitung sekali saat load pertama
+    return freeze(add_cross_section_stats(df))
 
 df = load_data(DATA_PATH)
 
@@ -44,7 +52,8 @@ focus_country = st.sidebar.selectbox(
     index=0,
 )
 
-dff = df[(df["year"] == year) & (df["country"].isin(selected_countries))].copy()
+# view (copy-on-write), bukan salinan
+dff = df[(df["year"] == year) & (df["country"].isin(selected_countries))]
 
 if dff.empty:
     st.warning("Tidak ada data untuk pilihan ini. Cek file CSV atau pilihan negara.")
@@ -87,45 +96,56 @@ with c3:
         delta_text(focus["unemployment_pct"], None if bench_avg is None else bench_avg["unemployment_pct"])
     )
 
+def rank_text(rank):
+    # negara tanpa nilai indikator tidak diberi peringkat
+    return "–" if pd.isna(rank) else f"#{rank:.0f}"
+
+n_year = int((df["year"] == year).sum())
+st.caption(
+    f"Peringkat {focus_country} di antara {n_year} negara ({year}): "
+    f"GDP growth {rank_text(focus['gdp_growth_pct_rank'])} · "
+    f"Inflasi {rank_text(focus['inflation_cpi_pct_rank'])} · "
+    f"Pengangguran {rank_text(focus['unemployment_pct_rank'])} (1 = tertinggi)"
+)
+
 # ===== Charts =====
 st.markdown("---")
 st.subheader("Perbandingan cepat antar negara")
 
-melt = dff.melt(
-    id_vars=["country","iso3","year"],
-    value_vars=["gdp_growth_pct","inflation_cpi_pct","unemployment_pct"],
-    var_name="indicator",
-    value_name="value"
-)
-
 indicator_labels = {
     "gdp_growth_pct": "GDP growth (annual %)",
     "inflation_cpi_pct": "Inflation, CPI (annual %)",
     "unemployment_pct": "Unemployment (% of labor force)"
 }
-melt["indicator"] = melt["indicator"].map(indicator_labels)
 
-colA, colB = st.columns([1,1])
+# Fragment: ganti indikator / urutan cukup rerun bagian grafik ini saja.
+# Dependensi eksplisit: dff + year (berubah hanya lewat sidebar -> full rerun).
+@st.fragment
+def comparison_chart(dff: pd.DataFrame, year) -> None:
+    colA, colB = st.columns([1,1])
 
-with colA:
-    chosen_indicator = st.selectbox("Indikator", list(indicator_labels.values()), index=0)
+    with colA:
+        chosen_indicator = st.selectbox("Indikator", list(indicator_labels.values()), index=0)
 
-with colB:
-    sort_mode = st.selectbox("Urutkan", ["Tertinggi → Terendah", "Terendah → Tertinggi"], index=0)
+    with colB:
+        sort_mode = st.selectbox("Urutkan", ["Tertinggi → Terendah", "Terendah → Tertinggi"], index=0)
 
-plot_df = melt[melt["indicator"] == chosen_indicator].copy()
-plot_df = plot_df.sort_values("value", ascending=(sort_mode == "Terendah → Tertinggi"))
+    col = next(k for k, v in indicator_labels.items() if v == chosen_indicator)
+    plot_df = dff[["country", col]].rename(columns={col: "value"})
+    plot_df = plot_df.sort_values("value", ascending=(sort_mode == "Terendah → Tertinggi"))
 
-fig = px.bar(
-    plot_df,
-    x="country",
-    y="value",
-    text="value",
-    title=f"{chosen_indicator} ({year})",
-)
-fig.update_traces(texttemplate="%{text:.1f}", textposition="outside")
-fig.update_layout(xaxis_title="", yaxis_title="", height=420)
-st.plotly_chart(fig, use_container_width=True)
+    fig = px.bar(
+        plot_df,
+        x="country",
+        y="value",
+        text="value",
+        title=f"{chosen_indicator} ({year})",
+    )
+    fig.update_traces(texttemplate="%{text:.1f}", textposition="outside")
+    fig.update_layout(xaxis_title="", yaxis_title="", height=420)
+    st.plotly_chart(fig, use_container_width=True)
+
+comparison_chart(dff, year)
 
 # ===== Interpretation =====
 st.markdown("### Interpretasi singkat")
@@ -150,4 +170,6 @@ st.write("\n".join(notes))
 with st.expander("Lihat tabel data"):
     st.dataframe(dff, use_container_width=True)
 
+export_section(dff, f"macro_{year}", key="home_export")
+
 st.caption("Sumber: World Bank country data pages (most recent value).")
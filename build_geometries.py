@@ -0,0 +1,153 @@
+"""
+Build the pre-simplified country boundaries used by the map page.
+
+Source: Natural Earth 1:110m admin-0 countries (public domain) as GeoJSON.
+Each level is simplified (Douglas-Peucker), coordinates are rounded and tiny
+islands dropped, and every feature gets id = ISO3 so plotly can join on iso3.
+
+Run:
+  python build_geometries.py path/to/ne_110m_admin_0_countries.geojson
+
+Output:
+  static/geo/countries_low.geojson   (world view)
+  static/geo/countries_mid.geojson   (region view)
+  static/geo/countries_high.geojson  (country view)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+import numpy as np
+
+OUT_DIR = "static/geo"
+
+# level -> (DP tolerance in degrees, decimals kept, min ring area in deg^2)
+LEVELS = {
+    "low": (0.5, 1, 1.0),
+    "mid": (0.15, 2, 0.05),
+    "high": (0.0, 3, 0.0),
+}
+
+# World Bank codes where Natural Earth's differ (Kosovo: NE KOS / -99, WB XKX).
+# Only countries the World Bank itself reports; N. Cyprus / Somaliland stay
+# separate shapes without data instead of duplicating CYP / SOM.
+ISO3_FIX = {"Kosovo": "XKX"}
+
+
+def _iso3(props: dict) -> str | None:
+    name = props.get("name") or props.get("NAME")
+    if name in ISO3_FIX:
+        return ISO3_FIX[name]
+    for key in ("iso_a3", "ISO_A3", "ADM0_A3", "adm0_a3"):
+        code = props.get(key)
+        if code and code != "-99":
+            return code
+    return None
+
+
+def simplify_ring(pts: np.ndarray, tol: float) -> np.ndarray:
+    """Douglas-Peucker on one closed ring (iterative, vectorised distances)."""
+    if tol <= 0 or len(pts) <= 4:
+        return pts
+    keep = np.zeros(len(pts), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        i, j = stack.pop()
+        if j <= i + 1:
+            continue
+        a, b = pts[i], pts[j]
+        seg = pts[i + 1:j]
+        ab = b - a
+        norm = np.hypot(*ab)
+        if norm == 0:
+            d = np.hypot(*(seg - a).T)
+        else:
+            d = np.abs(ab[0] * (seg[:, 1] - a[1]) - ab[1] * (seg[:, 0] - a[0])) / norm
+        k = int(np.argmax(d))
+        if d[k] > tol:
+            m = i + 1 + k
+            keep[m] = True
+            stack += [(i, m), (m, j)]
+    return pts[keep]
+
+
+def _signed_area(pts: np.ndarray) -> float:
+    """Shoelace; > 0 = counter-clockwise."""
+    x, y = pts[:, 0], pts[:, 1]
+    return 0.5 * (np.dot(x[:-1], y[1:]) - np.dot(x[1:], y[:-1]))
+
+
+def simplify_polygons(polys: list, tol: float, decimals: int, min_area: float) -> list:
+    """
+    polys: MultiPolygon coordinates -> simplified, small islands dropped.
+    Exterior rings are made clockwise and holes counter-clockwise (d3-geo /
+    plotly convention; RFC 7946 winding would fill the rest of the globe).
+    """
+    out = []
+    for poly in polys:
+        rings = []
+        for r, ring in enumerate(poly):
+            pts = simplify_ring(np.asarray(ring, dtype=float), tol).round(decimals)
+            # drop consecutive duplicates created by rounding
+            pts = pts[np.r_[True, np.any(np.diff(pts, axis=0) != 0, axis=1)]]
+            area = _signed_area(pts) if len(pts) >= 4 else 0.0
+            if len(pts) < 4 or abs(area) < max(min_area, 1e-12) and r == 0:
+                if r == 0:
+                    break  # whole polygon too small at this level
+                continue
+            if (r == 0) == (area > 0):
+                pts = pts[::-1]
+            rings.append(pts.tolist())
+        if rings:
+            out.append(rings)
+
+    if not out and polys:
+        # never drop a whole country; keep its largest polygon at full detail
+        largest = max(polys, key=lambda p: abs(_signed_area(np.asarray(p[0], dtype=float))))
+        pts = np.asarray(largest[0], dtype=float).round(max(decimals, 2))
+        out = [[(pts[::-1] if _signed_area(pts) > 0 else pts).tolist()]]
+    return out
+
+
+def build(src: dict) -> dict[str, dict]:
+    out = {}
+    for level, (tol, decimals, min_area) in LEVELS.items():
+        feats = []
+        for f in src["features"]:
+            iso3 = _iso3(f.get("properties") or {})
+            geom = f.get("geometry") or {}
+            if not iso3 or geom.get("type") not in ("Polygon", "MultiPolygon"):
+                continue
+            polys = geom["coordinates"] if geom["type"] == "MultiPolygon" else [geom["coordinates"]]
+            feats.append(
+                {
+                    "type": "Feature",
+                    "id": iso3,
+                    "properties": {"name": (f.get("properties") or {}).get("name")},
+                    "geometry": {"type": "MultiPolygon", "coordinates": simplify_polygons(polys, tol, decimals, min_area)},
+                }
+            )
+        out[level] = {"type": "FeatureCollection", "features": feats}
+    return out
+
+
+def main(path: str) -> None:
+    with open(path, encoding="utf-8") as f:
+        src = json.load(f)
+
+    os.makedirs(OUT_DIR, exist_ok=True)
+    for level, fc in build(src).items():
+        out_path = os.path.join(OUT_DIR, f"countries_{level}.geojson")
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(fc, f, separators=(",", ":"))
+        print(f"Saved: {out_path} (features={len(fc['features'])}, {os.path.getsize(out_path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(__doc__)
+    main(sys.argv[1])
@@ -3,19 +3,35 @@ Build a CSV of macro indicators (GDP growth, inflation CPI, unemployment)
 for ASEAN + selected comparator countries by pulling from the World Bank API.
 
 Run:
-  python build_macro_csv_worldbank.py
+  python build_macro_csv_worldbank.py             # full history -> panel + latest
+  python build_macro_csv_worldbank.py --mrv 5     # latest only, last 5 non-empty values
+
+--mrv N uses the API's most-recent-non-empty-value parameter (mrnev), so each
+country/indicator returns at most N observations instead of the whole history.
+Only the latest CSV is written in that mode (the panel needs full history).
+The "latest complete year across all indicators" rule still applies within
+those N years; raise N if a country's indicators rarely share a recent year.
 
 Output:
-  data/macro_indicators_worldbank_latest.csv
+  data/macro_indicators_worldbank_panel.csv   (full iso3 x year panel + derived metrics)
+  data/macro_indicators_worldbank_latest.csv  (latest complete row per country, a view of the panel)
+
+Derived metrics (YoY, rolling 3/5-year means, peer percentiles) are computed
+incrementally: rows already in the previous panel CSV are reused and only new or
+revised years are recomputed.
 """
 
 from __future__ import annotations
 
+import argparse
 import os
 import time
 import requests
 import pandas as pd
 
+import wb_spool
+from macro_panel import LATEST_COLS, PANEL_PATH, VALUE_COLS, derive_metrics, latest_complete
+
 OUT_PATH = "data/macro_indicators_worldbank_latest.csv"
 
 # Countries (ISO3)
@@ -36,34 +52,77 @@ INDICATORS = {
 API = "https://api.worldbank.org/v2"
 
 
-def fetch_indicator(country_list: list[str], indicator_code: str) -> pd.DataFrame:
-    """
-    Fetch indicator series for multiple countries from World Bank.
-    Returns columns: iso3, country, year, value
-    """
+def _get_json(url: str, params: dict):
+    r = requests.get(url, params=params, timeout=60)
+    r.raise_for_status()
+    return r.json()
+
+
+def _request(country_list: list[str], indicator_code: str, mrv: int | None = None) -> tuple[str, dict]:
     c_str = ";".join(country_list)
     url = f"{API}/country/{c_str}/indicator/{indicator_code}"
     params = {"format": "json", "per_page": 20000}
+    if mrv:
+        # most recent N non-empty values per country
+        params["mrnev"] = mrv
+    return url, params
 
-    r = requests.get(url, params=params, timeout=60)
-    r.raise_for_status()
-    payload = r.json()
 
-    data = payload[1] if isinstance(payload, list) and len(payload) > 1 else []
+def fetch_indicator(country_list: list[str], indicator_code: str, mrv: int | None = None) -> pd.DataFrame:
+    """
+    Fetch indicator series for multiple countries from World Bank.
+    Pages are checkpointed in the spool (wb_spool), so a rerun after a failure
+    skips everything already downloaded. mrv=N fetches only the last N non-empty
+    observations per country.
+    Returns columns: iso3, country, year, value
+    """
+    url, params = _request(country_list, indicator_code, mrv)
+    payloads = wb_spool.fetch_pages(url, params, _get_json)
+
     rows = []
-    for item in data:
-        if not item:
-            continue
-        rows.append(
-            {
-                "iso3": item.get("countryiso3code"),
-                "country": (item.get("country") or {}).get("value"),
-                "year": int(item.get("date")) if item.get("date") else None,
-                "value": item.get("value"),
-            }
-        )
+    for payload in payloads:
+        data = payload[1] if isinstance(payload, list) and len(payload) > 1 else []
+        for item in data or []:
+            if not item:
+                continue
+            rows.append(
+                {
+                    "iso3": item.get("countryiso3code"),
+                    "country": (item.get("country") or {}).get("value"),
+                    "year": int(item.get("date")) if item.get("date") else None,
+                    "value": item.get("value"),
+                }
+            )
+
+    return pd.DataFrame(rows, columns=["iso3", "country", "year", "value"])
+
+
+def build_panel(gdp: pd.DataFrame, inf: pd.DataFrame, u: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merge 3 indicators into one row per (iso3, year), keeping every year.
+    Returns columns: country, iso3, year, gdp_growth_pct, inflation_cpi_pct, unemployment_pct
+    """
+    frames = [
+        d.rename(columns={"value": col})[["iso3", "country", "year", col]]
+        for d, col in zip((gdp, inf, u), VALUE_COLS)
+    ]
+    frames = [d.dropna(subset=["iso3", "year"]) for d in frames]
+
+    # country names from whichever indicator has them (avoid country_x/country_y)
+    names = pd.concat(frames)[["iso3", "country"]].dropna().drop_duplicates("iso3")
 
-    return pd.DataFrame(rows)
+    m = frames[0].drop(columns="country")
+    for d in frames[1:]:
+        m = m.merge(d.drop(columns="country"), on=["iso3", "year"], how="outer")
+    m = m.merge(names, on="iso3", how="left")
+
+    for c in VALUE_COLS:
+        m[c] = pd.to_numeric(m[c], errors="coerce")
+    m["year"] = m["year"].astype(int)
+
+    # drop years where nothing was reported
+    m = m.dropna(subset=VALUE_COLS, how="all")
+    return m[LATEST_COLS].sort_values(["iso3", "year"]).reset_index(drop=True)
 
 
 def latest_complete_row(gdp: pd.DataFrame, inf: pd.DataFrame, u: pd.DataFrame) -> pd.DataFrame:
@@ -71,53 +130,55 @@ def latest_complete_row(gdp: pd.DataFrame, inf: pd.DataFrame, u: pd.DataFrame) -
     Merge 3 indicators per (iso3, year) and pick the latest year where all 3 exist.
     If no complete year exists, fallback to latest available GDP year.
     """
-    # rename value columns
-    gdp = gdp.rename(columns={"value": "gdp_growth_pct"})
-    inf = inf.rename(columns={"value": "inflation_cpi_pct"})
-    u = u.rename(columns={"value": "unemployment_pct"})
-
-    # merge with country carried from gdp (avoid country_x/country_y)
-    m = (
-        gdp[["iso3", "country", "year", "gdp_growth_pct"]]
-        .merge(inf[["iso3", "year", "inflation_cpi_pct"]], on=["iso3", "year"], how="left")
-        .merge(u[["iso3", "year", "unemployment_pct"]], on=["iso3", "year"], how="left")
-    )
-
-    out_rows = []
-    for iso3, grp in m.groupby("iso3"):
-        grp = grp.sort_values("year", ascending=False)
+    return latest_complete(build_panel(gdp, inf, u))[LATEST_COLS]
 
-        complete = grp.dropna(subset=["gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"])
-        pick = complete.iloc[0] if not complete.empty else grp.iloc[0]
-        out_rows.append(pick)
 
-    out = pd.DataFrame(out_rows)
-    out = out[["country", "iso3", "year", "gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"]]
-    return out.sort_values("country")
+def load_previous_panel(path: str = PANEL_PATH) -> pd.DataFrame | None:
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path)
 
 
-def main() -> None:
+def main(mrv: int | None = None) -> None:
     os.makedirs("data", exist_ok=True)
 
     # fetch indicators
-    gdp = fetch_indicator(COUNTRIES, INDICATORS["gdp_growth_pct"])
+    gdp = fetch_indicator(COUNTRIES, INDICATORS["gdp_growth_pct"], mrv)
     time.sleep(0.2)
-    inf = fetch_indicator(COUNTRIES, INDICATORS["inflation_cpi_pct"])
+    inf = fetch_indicator(COUNTRIES, INDICATORS["inflation_cpi_pct"], mrv)
     time.sleep(0.2)
-    u = fetch_indicator(COUNTRIES, INDICATORS["unemployment_pct"])
+    u = fetch_indicator(COUNTRIES, INDICATORS["unemployment_pct"], mrv)
 
     if gdp.empty:
         raise RuntimeError("No GDP data returned from World Bank API. Check internet/indicator code.")
 
-    df = latest_complete_row(gdp, inf, u)
-
-    # numeric conversion
-    for c in ["gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"]:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+    if mrv:
+        # partial history: latest snapshot only, keep the full panel untouched
+        df = latest_complete_row(gdp, inf, u)
+    else:
+        panel = derive_metrics(build_panel(gdp, inf, u), previous=load_previous_panel())
+        panel.to_csv(PANEL_PATH, index=False)
+        print(f"Saved: {PANEL_PATH} (rows={len(panel)})")
+        df = latest_complete(panel)[LATEST_COLS]
 
     df.to_csv(OUT_PATH, index=False)
     print(f"Saved: {OUT_PATH} (rows={len(df)})")
 
+    # everything written -> drop the page checkpoints of this build
+    for code in INDICATORS.values():
+        wb_spool.clear(*_request(COUNTRIES, code, mrv))
+
 
 if __name__ == "__main__":
-    main()
+    ap = argparse.ArgumentParser(description="Build macro CSVs from the World Bank API.")
+    ap.add_argument(
+        "--mrv",
+        type=int,
+        default=None,
+        metavar="N",
+        help="latest-only mode: fetch the last N non-empty values per country (e.g. 5)",
+    )
+    args = ap.parse_args()
+    if args.mrv is not None and args.mrv < 1:
+        ap.error("--mrv must be >= 1")
+    main(mrv=args.mrv)
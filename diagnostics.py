@@ -0,0 +1,67 @@
+import streamlit as st
+import pandas as pd
+
+import profiling
+
+# Halaman diagnostik tersembunyi (tidak ada di folder pages/).
+# Jalankan: streamlit run diagnostics.py
+st.set_page_config(page_title="Diagnostik Profiler", page_icon="🩺", layout="wide")
+
+st.title("🩺 Diagnostik Profiler")
+st.caption(
+    f"Profil per rerun dari folder `{profiling.PROFILE_DIR}`. "
+    "Aktifkan dengan env `DASH_PROFILE=1` atau tambah `?profile=1` di URL dashboard."
+)
+
+files = sorted(profiling.list_profiles(), reverse=True)
+if not files:
+    st.info("Belum ada profil tersimpan.")
+    st.stop()
+
+runs = []
+for fn in files[:100]:
+    try:
+        p = profiling.read_profile(fn)
+    except (OSError, ValueError):
+        continue
+    # "top" diurutkan kumulatif (entri pertama = script); terpanas = self time terbesar
+    hottest = max(p["top"], key=lambda r: r["self_s"])["function"] if p["top"] else ""
+    runs.append({"file": fn, "script": p["script"], "started": p["started"], "wall_s": p["wall_s"], "samples": p["samples"], "hottest": hottest})
+
+runs_df = pd.DataFrame(runs)
+
+st.subheader("Rerun terbaru")
+scripts = sorted(runs_df["script"].unique())
+chosen_scripts = st.multiselect("Script", scripts, default=scripts)
+runs_df = runs_df[runs_df["script"].isin(chosen_scripts)]
+st.dataframe(runs_df, use_container_width=True, hide_index=True)
+
+if runs_df.empty:
+    st.stop()
+
+fn = st.selectbox("Detail profil", runs_df["file"].tolist())
+p = profiling.read_profile(fn)
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Wall time", f"{p['wall_s']:.3f} s")
+c2.metric("Samples", p["samples"])
+c3.metric("Interval", f"{p['interval_s'] * 1000:.1f} ms")
+
+st.subheader("Fungsi terpanas (kumulatif)")
+st.dataframe(pd.DataFrame(p["top"]), use_container_width=True, hide_index=True)
+
+if p["loaders"]:
+    st.subheader("Loader data (utils_wb)")
+    st.dataframe(pd.DataFrame(p["loaders"]), use_container_width=True, hide_index=True)
+
+if p.get("caches"):
+    # profil lama (sebelum frame_cache) tidak punya bagian ini
+    caches = pd.DataFrame(p["caches"])
+    used = caches["bytes"].sum() / 2**20
+    st.subheader(f"Cache data (LRU): {used:.1f} / {p['cache_budget_bytes'] / 2**20:.0f} MB")
+    st.dataframe(caches.assign(MB=caches["bytes"] / 2**20).drop(columns="bytes"), use_container_width=True, hide_index=True)
+
+st.subheader("Call stack terpanas")
+for s in p["stacks"]:
+    with st.expander(f"{s['seconds']:.3f} s ({s['samples']} samples) — {s['stack'][-1]}"):
+        st.code("\n".join("  " * i + fr for i, fr in enumerate(s["stack"])), language=None)
@@ -0,0 +1,176 @@
+"""
+Size-bounded LRU cache for the data loaders, shared by all sessions of a process.
+
+st.cache_data / st.cache_resource bound entries only by TTL (or count), so
+every distinct year range or file keeps another full frame in memory. Here
+all @cached loaders share one byte budget (env DASH_CACHE_MB, default 512):
+each value is sized once on insert (DataFrame.memory_usage(deep=True),
+numpy nbytes, ...) and least recently used entries are evicted until the
+total fits again. stats() gives hit / miss / eviction counters per loader.
+
+Values are shared, not copied: loaders return read-only frames
+(macro_panel.freeze), like the st.cache_resource loaders they replace.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MAX_BYTES = int(float(os.environ.get("DASH_CACHE_MB", "512")) * 2**20)
+
+COUNTERS = ("hits", "misses", "evictions", "expired", "oversize")
+
+
+def estimate_bytes(obj) -> int:
+    """Approximate in-memory size of a cached value."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (tuple, list, set, frozenset)):
+        return sys.getsizeof(obj) + sum(estimate_bytes(v) for v in obj)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_bytes(k) + estimate_bytes(v) for k, v in obj.items())
+    return sys.getsizeof(obj)
+
+
+class _Entry:
+    __slots__ = ("name", "value", "nbytes", "expires")
+
+    def __init__(self, name: str, value, nbytes: int, expires: float | None):
+        self.name = name
+        self.value = value
+        self.nbytes = nbytes
+        self.expires = expires
+
+
+class FrameCache:
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._counters: dict[str, Counter] = {}
+        self._loading: dict[tuple, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, what: str) -> None:
+        self._counters.setdefault(name, Counter())[what] += 1
+
+    def _drop(self, key: tuple) -> _Entry:
+        entry = self._entries.pop(key)
+        self.nbytes -= entry.nbytes
+        return entry
+
+    def _lookup(self, key: tuple):
+        """Return (found, value); caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        if entry.expires is not None and entry.expires <= time.monotonic():
+            self._drop(key)
+            self._count(entry.name, "expired")
+            return False, None
+        self._entries.move_to_end(key)
+        self._count(entry.name, "hits")
+        return True, entry.value
+
+    def _store(self, name: str, key: tuple, value, ttl: float | None) -> None:
+        nbytes = estimate_bytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes > self.max_bytes:
+                # bigger than the whole budget: hand it out, do not keep it
+                self._count(name, "oversize")
+                return
+            self._entries[key] = _Entry(name, value, nbytes, None if ttl is None else time.monotonic() + ttl)
+            self.nbytes += nbytes
+            while self.nbytes > self.max_bytes:
+                old_key = next(iter(self._entries))
+                self._count(self._drop(old_key).name, "evictions")
+
+    def get_or_load(self, name: str, key: tuple, loader, ttl: float | None = None):
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                return value
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        # one load per key; concurrent callers wait and then hit
+        with key_lock:
+            with self._lock:
+                found, value = self._lookup(key)
+                if found:
+                    return value
+                self._count(name, "misses")
+            try:
+                value = loader()
+                self._store(name, key, value, ttl)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+        return value
+
+    def clear(self, name: str | None = None) -> None:
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if name is None or e.name == name]:
+                self._drop(key)
+
+    def stats(self) -> list[dict]:
+        """Per loader: counters, live entries and their estimated bytes."""
+        with self._lock:
+            out = {n: {"loader": n, **{c: cnt[c] for c in COUNTERS}, "entries": 0, "bytes": 0} for n, cnt in self._counters.items()}
+            for e in self._entries.values():
+                row = out.setdefault(e.name, {"loader": e.name, **dict.fromkeys(COUNTERS, 0), "entries": 0, "bytes": 0})
+                row["entries"] += 1
+                row["bytes"] += e.nbytes
+        return sorted(out.values(), key=lambda r: r["loader"])
+
+
+_cache = FrameCache()
+
+
+def cached(fn=None, *, ttl: float | None = None):
+    """
+    Decorator: memoise a loader in the shared byte-bounded LRU cache.
+    Key = loader (file + name, stable across Streamlit reruns) + bound
+    arguments with defaults applied. Arguments must be hashable.
+    """
+    def deco(fn):
+        name = f"{os.path.basename(fn.__code__.co_filename)}:{fn.__qualname__}"
+        sig = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (name, tuple(bound.arguments.items()))
+            return _cache.get_or_load(name, key, lambda: fn(*args, **kwargs), ttl)
+
+        wrapper.clear = lambda: _cache.clear(name)
+        return wrapper
+
+    return deco if fn is None else deco(fn)
+
+
+def stats() -> list[dict]:
+    return _cache.stats()
+
+
+def total_bytes() -> int:
+    return _cache.nbytes
+
+
+def clear() -> None:
+    _cache.clear()
@@ -0,0 +1,201 @@
+"""
+Concurrent-session load test for the dashboard pages (offline, bundled CSVs only).
+
+Each simulated session is a Streamlit AppTest of one page script that runs
+randomized widget interactions (year, countries, focus, indicator, sort,
+ASEAN filter, map scope). All sessions stay alive at once and take turns rerunning,
+like one Streamlit server process serving N open tabs; they share the
+st.cache_* caches. AppTest swaps global runtime state per run, so reruns
+inside one process are serialized; use --workers to spread sessions over
+several server-like processes.
+
+Run:
+  python loadtest_dashboard.py --sessions 20 --interactions 10
+  python loadtest_dashboard.py --pages Home.py --sessions 50 --workers 4 --seed 1
+
+Report: rerun latency p50/p90/p99/max per page, peak RSS, and the RSS
+increment per live session.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+PAGES = [
+    "Home.py",
+    "pages/2_Data_Makro_Ekonomi_Antar_Negara.py",
+    "pages/3_Perbandingan_Data_Ekonomi_Antar_Negara.py",
+    "pages/4_Peta_Indikator.py",
+]
+
+# label -> widget type, per page. pages/3 SQL mode is left out: it needs the
+# World Bank API for the countries table.
+INTERACTIONS = {
+    "Home.py": {
+        "Tahun": "selectbox",
+        "Pilih negara untuk ditampilkan": "multiselect",
+        "Negara fokus (untuk interpretasi singkat)": "selectbox",
+        "Indikator": "selectbox",
+        "Urutkan": "selectbox",
+    },
+    "pages/2_Data_Makro_Ekonomi_Antar_Negara.py": {
+        "Tampilkan ASEAN saja": "checkbox",
+        "Pilih indikator": "selectbox",
+    },
+    "pages/3_Perbandingan_Data_Ekonomi_Antar_Negara.py": {
+        "Pilih negara": "multiselect",
+        "Pilih indikator": "selectbox",
+    },
+    "pages/4_Peta_Indikator.py": {
+        "Indikator": "selectbox",
+        "Cakupan": "radio",
+    },
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux /proc), fallback to peak RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kB on Linux, bytes on macOS
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _find(at, kind: str, label: str):
+    for w in getattr(at, kind):
+        if w.label == label:
+            return w
+    return None
+
+
+def _interact(at, page: str, rng: random.Random) -> bool:
+    """Change one random widget; False if the page shows none of them (e.g. after st.stop)."""
+    choices = [(label, kind) for label, kind in INTERACTIONS[page].items() if _find(at, kind, label) is not None]
+    if not choices:
+        return False
+    label, kind = rng.choice(choices)
+    w = _find(at, kind, label)
+
+    if kind == "checkbox":
+        w.set_value(not w.value)
+    elif kind == "multiselect":
+        k = rng.randint(1, min(5, len(w.options)))
+        w.set_value(rng.sample(list(w.options), k))
+    else:
+        w.set_value(rng.choice(list(w.options)))
+    return True
+
+
+class Session:
+    def __init__(self, page: str, seed: int, timeout: float):
+        self.page = page
+        self.rng = random.Random(seed)
+        self.timeout = timeout
+        self.at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=timeout)
+
+    def rerun(self, interact: bool = True) -> float:
+        if interact and not _interact(self.at, self.page, self.rng):
+            # page ended in st.stop() without our widgets: open a fresh tab
+            self.at = AppTest.from_file(os.path.join(ROOT, self.page), default_timeout=self.timeout)
+        t0 = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - t0
+        if self.at.exception:
+            raise RuntimeError(f"{self.page}: {self.at.exception[0].value}")
+        return elapsed
+
+
+def run_worker(plan: list[tuple[str, int]], pages: list[str], interactions: int, timeout: float) -> dict:
+    """Run a group of sessions in this process, interleaved round-robin."""
+    # pages read data/... relative to cwd and import utils from the repo root
+    os.chdir(ROOT)
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+
+    # warm-up: imports + shared caches once, so the per-session increment excludes them
+    for page in pages:
+        Session(page, 0, timeout).rerun(interact=False)
+    base_rss = rss_mb()
+
+    latencies: dict[str, list[float]] = {p: [] for p in pages}
+    sessions = [Session(page, seed, timeout) for page, seed in plan]
+    for s in sessions:
+        latencies[s.page].append(s.rerun(interact=False))
+    for _ in range(interactions):
+        for s in sessions:
+            latencies[s.page].append(s.rerun())
+
+    return {
+        "latencies": latencies,
+        "sessions": len(sessions),
+        "base_rss": base_rss,
+        "end_rss": rss_mb(),
+        "peak_rss": peak_rss_mb(),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sessions", type=int, default=10, help="simulated concurrent sessions")
+    ap.add_argument("--interactions", type=int, default=10, help="widget changes per session")
+    ap.add_argument("--pages", nargs="+", default=PAGES, choices=PAGES)
+    ap.add_argument("--workers", type=int, default=1, help="server processes to spread sessions over")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--timeout", type=float, default=60.0, help="max seconds per rerun")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    plan = [(rng.choice(args.pages), rng.randrange(2**31)) for _ in range(args.sessions)]
+    groups = [plan[i::args.workers] for i in range(args.workers)]
+    groups = [g for g in groups if g]
+
+    t0 = time.perf_counter()
+    if len(groups) == 1:
+        reports = [run_worker(groups[0], args.pages, args.interactions, args.timeout)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(groups)) as ex:
+            futs = [ex.submit(run_worker, g, args.pages, args.interactions, args.timeout) for g in groups]
+            reports = [f.result() for f in futs]
+    elapsed = time.perf_counter() - t0
+
+    print(f"sessions={args.sessions} workers={len(groups)} interactions/session={args.interactions} wall={elapsed:.1f}s")
+    print(f"{'page':<52} {'reruns':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    total = 0
+    for page in args.pages:
+        lat = [x for r in reports for x in r["latencies"][page]]
+        if not lat:
+            continue
+        total += len(lat)
+        q = np.percentile(np.array(lat) * 1000, [50, 90, 99, 100])
+        print(f"{page:<52} {len(lat):>6} {q[0]:>8.1f} {q[1]:>8.1f} {q[2]:>8.1f} {q[3]:>8.1f}")
+    print(f"reruns/s: {total / elapsed:.1f}")
+
+    for i, r in enumerate(reports):
+        inc = (r["end_rss"] - r["base_rss"]) / max(r["sessions"], 1)
+        print(
+            f"worker {i}: peak RSS {r['peak_rss']:.1f} MB, after warm-up {r['base_rss']:.1f} MB, "
+            f"with {r['sessions']} live sessions {r['end_rss']:.1f} MB, per-session increment {inc:.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Chunked export of macro data to CSV, Parquet or Excel.
+
+Data is read and written in chunks of CHUNK_ROWS rows, from an in-memory
+selection or straight from a file in data/ (Parquet row batches / CSV
+chunks), so exporting the full panel never holds a second full copy.
+Output goes to a temp file on disk, handed back opened for reading; the file
+is removed when that reader is closed (or garbage collected).
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from typing import Iterator
+
+import pandas as pd
+
+CHUNK_ROWS = 50_000
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", ".xlsx"),
+}
+
+
+def iter_frame(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def iter_file(path: str, chunk_rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Read a data/ file chunk by chunk (Parquet row batches or CSV chunks)."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+def iter_csv_bytes(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """CSV encoded chunk by chunk; header only once."""
+    header = True
+    for chunk in chunks:
+        yield chunk.to_csv(index=False, header=header).encode("utf-8")
+        header = False
+
+
+def _write_parquet(chunks: Iterator[pd.DataFrame], out) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            # one row group per chunk
+            writer.write_table(table.cast(writer.schema))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_xlsx(chunks: Iterator[pd.DataFrame], out) -> None:
+    from openpyxl import Workbook
+
+    # write_only: rows are streamed to the zip instead of kept as cell objects
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("data")
+    header = True
+    for chunk in chunks:
+        if header:
+            ws.append(list(chunk.columns))
+            header = False
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append([None if pd.isna(v) else v for v in row])
+    wb.save(out)
+
+
+class _TempReader(io.BufferedReader):
+    """Binary reader over a temp file that deletes the file on close."""
+
+    def __init__(self, path: str):
+        super().__init__(io.FileIO(path, "r"))
+        self._path = path
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            try:
+                os.unlink(self._path)
+            except OSError:
+                pass
+
+
+def write_export(chunks: Iterator[pd.DataFrame], fmt: str) -> io.BufferedReader:
+    """
+    Write chunks in `fmt` to a temp file and return it opened for reading.
+    A plain io.BufferedReader, so st.download_button accepts it as data.
+    Raises ImportError if the format needs pyarrow / openpyxl and it is missing.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {list(FORMATS)}")
+
+    out = tempfile.NamedTemporaryFile(suffix=FORMATS[fmt][1], delete=False)
+    try:
+        with out:
+            if fmt == "csv":
+                for b in iter_csv_bytes(chunks):
+                    out.write(b)
+            elif fmt == "parquet":
+                _write_parquet(chunks, out)
+            else:
+                _write_xlsx(chunks, out)
+        return _TempReader(out.name)
+    except BaseException:
+        os.unlink(out.name)
+        raise
+
+
+def iter_file_bytes(f, block_size: int = 1 << 16) -> Iterator[bytes]:
+    """Read a file in blocks, for chunked HTTP responses."""
+    while True:
+        b = f.read(block_size)
+        if not b:
+            break
+        yield b
+
+
+def export_name(base: str, fmt: str) -> str:
+    return os.path.splitext(os.path.basename(base))[0] + FORMATS[fmt][1]
+
+
+def can_export(fmt: str) -> bool:
+    mod = {"parquet": "pyarrow", "xlsx": "openpyxl"}.get(fmt)
+    if mod is None:
+        return True
+    try:
+        __import__(mod)
+    except ImportError:
+        return False
+    return True
+
@@ -0,0 +1,371 @@
+"""
+Panel helpers for the macro dataset (one row per iso3 x year).
+
+Pure pandas (no streamlit import) so the build script can use them too.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+import pandas as pd
+
+# Copy-on-write: filtered frames share memory with the cached frame until
+# written, and .values / .to_numpy() are read-only views (always on from
+# pandas 3, opt-in on 2.x).
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+PANEL_PATH = "data/macro_indicators_worldbank_panel.csv"
+
+KEY_COLS = ["iso3", "year"]
+VALUE_COLS = ["gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"]
+# label di UI -> kolom (selectbox indikator di pages/)
+INDICATOR_MAP = {
+    "GDP Growth (%)": "gdp_growth_pct",
+    "Inflation CPI (%)": "inflation_cpi_pct",
+    "Unemployment (%)": "unemployment_pct",
+}
+# anggota ASEAN (filter cakupan di pages/)
+ASEAN_ISO3 = frozenset({"BRN", "KHM", "IDN", "LAO", "MYS", "MMR", "PHL", "SGP", "THA", "VNM"})
+LATEST_COLS = ["country", "iso3", "year"] + VALUE_COLS
+
+ROLLING_WINDOWS = (3, 5)
+LOOKBACK_YEARS = max(ROLLING_WINDOWS) - 1
+
+# derived series per indicator:
+#   time series   <col>_yoy, <col>_avg3, <col>_avg5
+#   cross section <col>_rank (1 = highest that year), <col>_pctl (0..1], <col>_z
+TS_SUFFIXES = ["yoy"] + [f"avg{w}" for w in ROLLING_WINDOWS]
+XS_SUFFIXES = ["rank", "pctl", "z"]
+DERIVED_SUFFIXES = TS_SUFFIXES + XS_SUFFIXES
+DERIVED_COLS = [f"{c}_{s}" for c in VALUE_COLS for s in DERIVED_SUFFIXES]
+XS_COLS = [f"{c}_{s}" for c in VALUE_COLS for s in XS_SUFFIXES]
+
+# column names seen in older / hand-made CSVs
+RENAME_MAP = {
+    "Country": "country",
+    "countryiso3code": "iso3",
+    "Country Code": "iso3",
+}
+
+
+def read_macro_csv(path: str) -> pd.DataFrame:
+    """
+    Read a macro CSV from data/ and normalise column names and dtypes.
+    Shared by the dashboard pages and query_api.py.
+    """
+    df = pd.read_csv(path)
+    df.columns = [c.strip() for c in df.columns]
+    df = df.rename(columns={k: v for k, v in RENAME_MAP.items() if k in df.columns})
+
+    # Pastikan numerik
+    for c in VALUE_COLS + DERIVED_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    return df
+
+
+def full_panel_path() -> str | None:
+    """Full panel file written by the build script (Parquet if present, else CSV)."""
+    parquet = os.path.splitext(PANEL_PATH)[0] + ".parquet"
+    for path in (parquet, PANEL_PATH):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class _ReadOnlyIndexer:
+    """loc / iloc / at / iat of a frozen object: reads pass through, writes raise."""
+
+    def __init__(self, indexer):
+        self._indexer = indexer
+
+    def __call__(self, *args, **kwargs):
+        return _ReadOnlyIndexer(self._indexer(*args, **kwargs))
+
+    def __getitem__(self, key):
+        return self._indexer[key]
+
+    def __setitem__(self, key, value):
+        _read_only()
+
+
+def _read_only(*args, **kwargs):
+    raise TypeError(
+        "Frame cache bersifat read-only (dibagi semua sesi). "
+        "Buat salinan dulu (.copy()) atau turunkan kolom dengan .assign()."
+    )
+
+
+class _ReadOnly:
+    """
+    Rejects every in-place change of the object itself. Results of methods
+    (filters, .assign(), .copy(), arithmetic) are plain pandas objects; with
+    copy-on-write they never write back into the shared buffers.
+    """
+
+    __setitem__ = _read_only
+    __delitem__ = _read_only
+    insert = _read_only
+    pop = _read_only
+    # every inplace=True method ends here
+    _update_inplace = _read_only
+
+    loc = property(lambda self: _ReadOnlyIndexer(super(_ReadOnly, self).loc))
+    iloc = property(lambda self: _ReadOnlyIndexer(super(_ReadOnly, self).iloc))
+    at = property(lambda self: _ReadOnlyIndexer(super(_ReadOnly, self).at))
+    iat = property(lambda self: _ReadOnlyIndexer(super(_ReadOnly, self).iat))
+
+    _frozen = False
+
+    def __setattr__(self, name, value):
+        # df.columns = ..., s.name = ..., df.<column> = ... (pandas internals use _names)
+        if self._frozen and not name.startswith("_"):
+            if name in ("columns", "index", "name") or name in getattr(self, "columns", ()):
+                _read_only()
+        super().__setattr__(name, value)
+
+
+class FrozenFrame(_ReadOnly, pd.DataFrame):
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    @property
+    def _constructor_sliced(self):
+        return pd.Series
+
+
+class FrozenSeries(_ReadOnly, pd.Series):
+    @property
+    def _constructor(self):
+        return pd.Series
+
+    @property
+    def _constructor_expanddim(self):
+        return pd.DataFrame
+
+
+def freeze(obj):
+    """
+    Read-only view of a cached DataFrame / Series (no data copy under
+    copy-on-write). Writes to it (df[c] = ..., df.loc[...] = ..., insert / pop /
+    del, inplace=True, replacing columns / index) raise TypeError instead of
+    leaking into other sessions; derive per-session columns with .assign().
+    """
+    if isinstance(obj, _ReadOnly):
+        return obj
+    if isinstance(obj, pd.DataFrame):
+        out = FrozenFrame(obj)
+    elif isinstance(obj, pd.Series):
+        out = FrozenSeries(obj)
+    else:
+        raise TypeError(f"freeze() expects a DataFrame or Series, got {type(obj).__name__}")
+    object.__setattr__(out, "_frozen", True)
+    # keep the source alive: its blocks stay referenced, so copy-on-write copies
+    # before any in-place block operation (replace / where / ... inplace=True)
+    # and the shared buffers are untouched even though the method then raises
+    object.__setattr__(out, "_source", obj)
+    return out
+
+
+def _same_values(a: pd.DataFrame, b: pd.DataFrame) -> pd.Series:
+    """Row-wise equality that treats NaN == NaN."""
+    eq = a.eq(b) | (a.isna() & b.isna())
+    return eq.all(axis=1)
+
+
+def _time_series_metrics(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    YoY change and rolling means on a calendar-year grid (gaps stay gaps).
+    Return: indexed by (iso3, year), only rows present in `panel`.
+    """
+    idx = pd.MultiIndex.from_frame(panel[KEY_COLS])
+    years = np.arange(panel["year"].min(), panel["year"].max() + 1)
+
+    out = {}
+    for col in VALUE_COLS:
+        wide = panel.pivot(index="year", columns="iso3", values=col).reindex(years)
+        out[f"{col}_yoy"] = wide.diff()
+        for w in ROLLING_WINDOWS:
+            out[f"{col}_avg{w}"] = wide.rolling(w, min_periods=1).mean()
+
+    res = pd.DataFrame(
+        {name: w.stack(future_stack=True).swaplevel() for name, w in out.items()}
+    )
+    res.index.names = KEY_COLS
+    return res.reindex(idx)
+
+
+def _cross_section(panel: pd.DataFrame, by_year: bool = True) -> pd.DataFrame:
+    """
+    Rank, peer percentile and z-score of each value within its year (or across
+    the whole frame for a latest-value snapshot), in one groupby pass.
+    """
+    values = panel[VALUE_COLS]
+    key = panel["year"] if by_year else np.zeros(len(panel), dtype=int)
+    grp = values.groupby(key)
+    mean = grp.transform("mean")
+    std = grp.transform("std")
+    stats = {
+        "rank": grp.rank(ascending=False, method="min"),
+        "pctl": grp.rank(pct=True),
+        "z": (values - mean) / std.where(std > 0),
+    }
+
+    res = pd.DataFrame(index=pd.MultiIndex.from_frame(panel[KEY_COLS]))
+    for col in VALUE_COLS:
+        for suffix in XS_SUFFIXES:
+            res[f"{col}_{suffix}"] = stats[suffix][col].to_numpy()
+    return res
+
+
+def add_cross_section_stats(df: pd.DataFrame, by_year: bool = True) -> pd.DataFrame:
+    """
+    Ensure XS_COLS exist (files from older builds / hand-made CSVs lack them).
+    by_year=False ranks a latest-value snapshot (mixed years) as one group.
+    Meant for the first load of a dataset; cached by the caller.
+    """
+    if set(XS_COLS) <= set(df.columns):
+        return df
+    df = df.drop(columns=XS_COLS, errors="ignore").reset_index(drop=True)
+    return df.join(_cross_section(df, by_year).reset_index(drop=True))
+
+
+def league_table(df: pd.DataFrame, col: str, n: int = 5, bottom: bool = False) -> pd.DataFrame:
+    """
+    Top (or bottom) n rows of one cross-section via the precomputed <col>_rank
+    (no re-sorting of values; also works on a filtered subset, e.g. ASEAN only).
+    """
+    rank_col = f"{col}_rank"
+    d = df.dropna(subset=[rank_col])
+    # rank 1 = highest value
+    return d.nlargest(n, rank_col) if bottom else d.nsmallest(n, rank_col)
+
+
+def derive_metrics(panel: pd.DataFrame, previous: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Add DERIVED_COLS to a raw panel (iso3, country, year, VALUE_COLS).
+
+    If `previous` (an earlier output of this function) is given, derived values
+    are reused for unchanged rows and only recomputed where years were added,
+    revised or removed: time-series metrics from the first changed year per
+    country (with enough lookback for the rolling windows), cross-section stats
+    for the changed years.
+    """
+    panel = panel.drop(columns=DERIVED_COLS, errors="ignore")
+    panel = panel.sort_values(KEY_COLS).reset_index(drop=True)
+    if panel.empty:
+        return panel.reindex(columns=list(panel.columns) + DERIVED_COLS)
+
+    usable = (
+        previous is not None
+        and not previous.empty
+        and set(KEY_COLS + VALUE_COLS + DERIVED_COLS) <= set(previous.columns)
+    )
+    if not usable:
+        derived = _time_series_metrics(panel).join(_cross_section(panel))
+        return panel.join(derived[DERIVED_COLS].reset_index(drop=True))
+
+    cur = panel.set_index(KEY_COLS)
+    prev = previous.set_index(KEY_COLS)
+    common = cur.index.intersection(prev.index)
+    unchanged = common[_same_values(cur.loc[common, VALUE_COLS], prev.loc[common, VALUE_COLS])]
+    # rows that disappeared (all values null / country dropped) also shift
+    # later years' yoy / rolling means and their year's cross-section
+    dirty = cur.index.difference(unchanged).union(prev.index.difference(cur.index))
+
+    derived = prev.loc[unchanged, DERIVED_COLS].reindex(cur.index)
+    if len(dirty):
+        first_dirty = dirty.to_frame(index=False).groupby("iso3")["year"].min()
+
+        # time-series metrics: only dirty countries, from first dirty year minus lookback
+        start = panel["iso3"].map(first_dirty)
+        window = panel[start.notna() & (panel["year"] >= start - LOOKBACK_YEARS)]
+        if not window.empty:  # empty when only whole countries were removed
+            ts = _time_series_metrics(window)
+            keep = window["year"].to_numpy() >= window["iso3"].map(first_dirty).to_numpy()
+            ts = ts[keep]
+            derived.loc[ts.index, ts.columns] = ts
+
+        # rank / percentile / z-score: whole cross-section of every dirty year
+        dirty_years = dirty.get_level_values("year").unique()
+        pc = _cross_section(panel[panel["year"].isin(dirty_years)])
+        derived.loc[pc.index, pc.columns] = pc
+
+    return panel.join(derived.astype(float).reset_index(drop=True))
+
+
+def latest_complete(panel: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per country: the latest year where all VALUE_COLS exist.
+    If no complete year exists, fallback to the latest year with GDP, then any year.
+    """
+    rank = panel[VALUE_COLS].notna().all(axis=1).astype(int) * 2 + panel["gdp_growth_pct"].notna()
+    out = (
+        panel.assign(_rank=rank)
+        .sort_values(["iso3", "_rank", "year"], ascending=[True, False, False])
+        .drop_duplicates("iso3")
+        .drop(columns="_rank")
+    )
+    return out.sort_values("country").reset_index(drop=True)
+
+
+MATRIX_KINDS = ("corr", "cov", "dist")
+
+
+def pairwise_matrix(X: np.ndarray, kind: str = "corr", min_obs: int = 3) -> np.ndarray:
+    """
+    NaN-aware pairwise corr / cov / RMS distance between the columns of X
+    (rows = observations), each pair using only rows where both are present.
+    Batched as a few matrix products, no per-pair Python loop.
+    """
+    if kind not in MATRIX_KINDS:
+        raise ValueError(f"kind must be one of {MATRIX_KINDS}")
+
+    X = np.asarray(X, dtype=float)
+    M = (~np.isnan(X)).astype(float)
+    Xz = np.where(M > 0, X, 0.0)
+
+    n = M.T @ M                 # n[i, j]  = rows where both i and j exist
+    s = Xz.T @ M                # s[i, j]  = sum of x_i over those rows
+    ss = (Xz * Xz).T @ M        # ss[i, j] = sum of x_i^2 over those rows
+    p = Xz.T @ Xz               # p[i, j]  = sum of x_i * x_j
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if kind == "dist":
+            out = np.sqrt(np.maximum(ss + ss.T - 2 * p, 0) / n)
+        else:
+            cov = (p - s * s.T / n) / (n - 1)
+            if kind == "cov":
+                out = cov
+            else:
+                var = (ss - s * s / n) / (n - 1)  # var of i over the pair's rows
+                out = cov / np.sqrt(var * var.T)
+                out = np.clip(out, -1, 1)
+
+    out[n < min_obs] = np.nan
+    return out
+
+
+def panel_matrix(panel: pd.DataFrame, axis: str, kind: str = "corr", col: str | None = None, min_obs: int = 3) -> pd.DataFrame:
+    """
+    axis="country":   countries x countries for one indicator `col`, over years.
+    axis="indicator": indicators x indicators, over all country-year rows
+                      (indicators are z-scored first so distances are comparable).
+    """
+    if axis == "country":
+        wide = panel.pivot_table(index="year", columns="country", values=col, aggfunc="first")
+    elif axis == "indicator":
+        cols = [c for c in VALUE_COLS if c in panel.columns]
+        wide = panel[cols]
+        if kind == "dist":
+            wide = (wide - wide.mean()) / wide.std()
+    else:
+        raise ValueError("axis must be 'country' or 'indicator'")
+
+    mat = pairwise_matrix(wide.to_numpy(dtype=float), kind, min_obs)
+    return pd.DataFrame(mat, index=wide.columns, columns=wide.columns)
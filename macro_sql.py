@@ -0,0 +1,117 @@
+"""
+Embedded SQL (DuckDB) over the files in data/.
+
+Every CSV / Parquet file becomes a view named after the file without the
+"macro_indicators_" prefix, e.g. data/macro_indicators_worldbank_panel.csv ->
+worldbank_panel. Parquet wins over CSV when both exist. DuckDB scans the files
+itself (vectorised, out-of-core), so nothing is loaded into pandas until the
+result comes back. data/ is re-scanned (path + mtime) whenever the connection
+is fetched, so files built later (e.g. the panel) appear without a restart.
+
+The connection can only read files under data/ (no other paths, no URLs,
+no extension installs) and its configuration is locked, so a query typed
+into the dashboard cannot reach the rest of the server.
+
+Optional table `countries` (iso3, country, region, income, lending) can be
+registered from utils_wb.fetch_countries() for joins.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import threading
+
+import pandas as pd
+
+DATA_DIR = "data"
+VIEW_PREFIX = "macro_indicators_"
+
+_READERS = {".parquet": "read_parquet", ".csv": "read_csv_auto"}
+
+COUNTRY_COLS = ["iso3", "country", "region", "income", "lending"]
+
+# read-only helper: a single SELECT / WITH statement (leading -- comments allowed)
+_ALLOWED = re.compile(r"^(\s*--[^\n]*\n)*\s*(select|with)\b", re.IGNORECASE)
+
+_con = None
+_con_lock = threading.Lock()
+# view name -> (path, mtime) it was created from
+_views: dict[str, tuple[str, float]] = {}
+
+
+def table_files(data_dir: str = DATA_DIR) -> dict[str, str]:
+    """view name -> file path"""
+    out: dict[str, str] = {}
+    for fn in sorted(os.listdir(data_dir)):
+        stem, ext = os.path.splitext(fn)
+        if ext not in _READERS:
+            continue
+        name = stem[len(VIEW_PREFIX):] if stem.startswith(VIEW_PREFIX) else stem
+        if name in out and ext != ".parquet":
+            continue
+        out[name] = os.path.join(data_dir, fn)
+    return out
+
+
+def _sync_views(con) -> None:
+    """(Re)create views for files added / replaced in data/ since the last call; drop removed ones."""
+    current = {name: (path, os.path.getmtime(path)) for name, path in table_files().items()}
+    for name in set(_views) - set(current):
+        con.execute(f"DROP VIEW IF EXISTS \"{name}\"")
+        del _views[name]
+    for name, (path, mtime) in current.items():
+        if _views.get(name) == (path, mtime):
+            continue
+        reader = _READERS[os.path.splitext(path)[1]]
+        con.execute(f"CREATE OR REPLACE VIEW \"{name}\" AS SELECT * FROM {reader}('{path}')")
+        _views[name] = (path, mtime)
+
+
+def _connection():
+    global _con
+    import duckdb
+
+    with _con_lock:
+        if _con is None:
+            con = duckdb.connect(database=":memory:")
+            # the SELECT guard is not a sandbox (read_text('/etc/...'), URLs, ...):
+            # only files under data/ stay readable, then freeze the settings
+            data_dir = os.path.join(os.path.abspath(DATA_DIR), "")
+            con.execute(f"SET allowed_directories = ['{data_dir}']")
+            con.execute("SET autoinstall_known_extensions = false")
+            con.execute("SET autoload_known_extensions = false")
+            con.execute("SET enable_external_access = false")
+            con.execute("SET lock_configuration = true")
+            _con = con
+        # files built after startup (e.g. the panel) show up without a restart
+        _sync_views(_con)
+    return _con
+
+
+def register_countries(countries: pd.DataFrame) -> None:
+    """Expose fetch_countries() metadata as table `countries`."""
+    countries = countries.reindex(columns=COUNTRY_COLS).astype("object")
+    con = _connection()
+    with _con_lock:
+        con.register("_countries_df", countries)
+        con.execute("CREATE OR REPLACE TABLE countries AS SELECT * FROM _countries_df")
+        con.unregister("_countries_df")
+
+
+def list_tables() -> list[str]:
+    cur = _connection().cursor()
+    return [r[0] for r in cur.execute("SELECT table_name FROM information_schema.tables ORDER BY 1").fetchall()]
+
+
+def run_sql(sql: str) -> pd.DataFrame:
+    """Run one read-only query and return the result as a DataFrame."""
+    stmt = sql.strip().rstrip(";")
+    if not _ALLOWED.match(stmt) or ";" in stmt:
+        raise ValueError("Hanya satu query SELECT / WITH yang diizinkan.")
+    # cursor per call: DuckDB connections are not shared across threads
+    cur = _connection().cursor()
+    try:
+        return cur.execute(stmt).df()
+    finally:
+        cur.close()
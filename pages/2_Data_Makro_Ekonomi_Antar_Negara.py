@@ -1,37 +1,47 @@
+import os
+
 import streamlit as st
 import pandas as pd
 
+import frame_cache
+import profiling
+from macro_panel import ASEAN_ISO3, INDICATOR_MAP, PANEL_PATH, VALUE_COLS, add_cross_section_stats, freeze, league_table, read_macro_csv
+from utils_ui import export_section, load_panel, paged_table
+
 st.set_page_config(page_title="Data Makro Ekonomi Antar Negara", page_icon="📊", layout="wide")
 
-DATA_PATH = "data/macro_indicators_worldbank_latest.csv"
+profiling.profile_this_run()
 
-ASEAN_ISO3 = {"BRN", "KHM", "IDN", "LAO", "MYS", "MMR", "PHL", "SGP", "THA", "VNM"}
+DATA_PATH = "data/macro_indicators_worldbank_latest.csv"
 
-@st.cache_data
+@frame_cache.cached
 def load_data(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
-    df.columns = [c.strip() for c in df.columns]
-
-    # Normalisasi nama kolom kalau ternyata beda format
-    rename_map = {
-        "Country": "country",
-        "countryiso3code": "iso3",
-        "Country Code": "iso3",
-        "gdp_growth_pct": "gdp_growth_pct",
-        "inflation_cpi_pct": "inflation_cpi_pct",
-        "unemployment_pct": "unemployment_pct",
-        "gdp_growth_pct": "gdp_growth_pct",          # jaga-jaga kalau ada versi lain
-        "inflation_cpi_pct": "inflation_cpi_pct",
-        "unemployment_pct": "unemployment_pct",
-    }
-    df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
-
-    # Pastikan numerik
-    for c in ["gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-
-    return df
+    # normalisasi nama kolom + numerik ada di macro_panel.read_macro_csv
+    df = read_macro_csv(path)
+    if set(["year"] + VALUE_COLS) <= set(df.columns):
+        # file "latest" = snapshot beda tahun per negara -> rank dihitung di seluruh file
+        df = add_cross_section_stats(df, by_year=False)
+    return freeze(df)
+
+
+# Interpretasi
+def interpret(r):
+    if pd.isna(r["gdp_growth_pct"]) or pd.isna(r["inflation_cpi_pct"]) or pd.isna(r["unemployment_pct"]):
+        return "Data belum lengkap"
+
+    g, i, u = r["gdp_growth_pct"], r["inflation_cpi_pct"], r["unemployment_pct"]
+
+    g_txt = "Kontraksi" if g < 0 else ("Rendah" if g < 2 else ("Sedang" if g < 4 else "Tinggi"))
+    i_txt = "Terkendali" if i < 3 else ("Sedang" if i < 6 else "Tinggi")
+    u_txt = "Rendah" if u < 3 else ("Sedang" if u < 6 else "Tinggi")
+
+    return f"GDP {g_txt} | Inflasi {i_txt} | Pengangguran {u_txt}"
+
+
+@frame_cache.cached
+def load_interpretation(path: str) -> pd.Series:
+    # dihitung sekali per file, bukan per rerun
+    return freeze(load_data(path).apply(interpret, axis=1))
 
 
 st.title("📊 Data Makro Ekonomi Antar Negara")
@@ -58,48 +68,73 @@ if missing:
 # Filter ASEAN
 only_asean = st.checkbox("Tampilkan ASEAN saja", value=False)
 if only_asean:
-    df = df[df["iso3"].isin(ASEAN_ISO3)].copy()
+    df = df[df["iso3"].isin(ASEAN_ISO3)]
 
-# Interpretasi
-def interpret(r):
-    if pd.isna(r["gdp_growth_pct"]) or pd.isna(r["inflation_cpi_pct"]) or pd.isna(r["unemployment_pct"]):
-        return "Data belum lengkap"
+# kolom turunan per sesi disimpan terpisah, frame cache tidak diubah
+interpretasi = load_interpretation(DATA_PATH).loc[df.index]
 
-    g, i, u = r["gdp_growth_pct"], r["inflation_cpi_pct"], r["unemployment_pct"]
+# Tabel
+st.subheader("Tabel Data")
 
-    g_txt = "Kontraksi" if g < 0 else ("Rendah" if g < 2 else ("Sedang" if g < 4 else "Tinggi"))
-    i_txt = "Terkendali" if i < 3 else ("Sedang" if i < 6 else "Tinggi")
-    u_txt = "Rendah" if u < 3 else ("Sedang" if u < 6 else "Tinggi")
+df_show = df[["country", "iso3", "year", "gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct"]].assign(
+    interpretasi=interpretasi
+)
+export_name = "macro_indicators_latest"
+
+# panel lengkap negara x tahun (kalau sudah dibuat build script)
+source = st.radio("Sumber tabel", ["Terbaru", "Panel lengkap"], horizontal=True) if os.path.exists(PANEL_PATH) else "Terbaru"
+if source == "Panel lengkap":
+    df_show = load_panel(PANEL_PATH)
+    if only_asean:
+        df_show = df_show[df_show["iso3"].isin(ASEAN_ISO3)]
+    export_name = "macro_indicators_panel"
+
+# filter, urut dan halaman di server; hanya halaman aktif yang diformat & dikirim
+# nilai & rata-rata 1 desimal, rank bulat, persentil / z-score 2 desimal
+decimals = {
+    c: 0 if c.endswith("_rank") else (2 if c.endswith(("_pctl", "_z")) else 1)
+    for c in df_show.columns
+    if c.startswith(tuple(VALUE_COLS))
+}
+paged_table(df_show, key="p2_table", decimals=decimals)
 
-    return f"GDP {g_txt} | Inflasi {i_txt} | Pengangguran {u_txt}"
+export_section(df_show, export_name, key="p2_export")
 
-df["interpretasi"] = df.apply(interpret, axis=1)
+# Visualisasi (fragment: ganti indikator tidak menghitung ulang tabel di atas)
+@st.fragment
+def indicator_chart(df: pd.DataFrame) -> None:
+    st.subheader("Visualisasi Indikator")
 
-# Tabel
-st.subheader("Tabel Data")
+    label = st.selectbox("Pilih indikator", list(INDICATOR_MAP.keys()))
+    col = INDICATOR_MAP[label]
 
-df_show = df[["country", "iso3", "year", "gdp_growth_pct", "inflation_cpi_pct", "unemployment_pct", "interpretasi"]]
+    plot_df = df[["country", col]].dropna().set_index("country")
+    st.bar_chart(plot_df, height=360)
 
-st.dataframe(
-    df_show.style.format({
-        "gdp_growth_pct": "{:.1f}",
-        "inflation_cpi_pct": "{:.1f}",
-        "unemployment_pct": "{:.1f}",
-    }),
-    width="stretch",
-)
 
-# Visualisasi
-st.subheader("Visualisasi Indikator")
+indicator_chart(df)
 
-indicator_map = {
-    "GDP Growth (%)": "gdp_growth_pct",
-    "Inflation CPI (%)": "inflation_cpi_pct",
-    "Unemployment (%)": "unemployment_pct",
-}
 
-label = st.selectbox("Pilih indikator", list(indicator_map.keys()))
-col = indicator_map[label]
+# Top / Bottom N dari rank yang sudah dihitung saat load (tanpa sort ulang)
+@st.fragment
+def league_section(df: pd.DataFrame) -> None:
+    st.subheader("Top / Bottom N")
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        label = st.selectbox("Indikator", list(INDICATOR_MAP.keys()), key="league_indicator")
+    with c2:
+        side = st.radio("Urutan", ["Tertinggi", "Terendah"], horizontal=True)
+    with c3:
+        n = st.slider("N", 1, 10, 5)
+
+    col = INDICATOR_MAP[label]
+    top = league_table(df, col, n, bottom=(side == "Terendah"))
+    st.dataframe(
+        top[["country", "iso3", "year", col, f"{col}_rank", f"{col}_pctl", f"{col}_z"]],
+        width="stretch",
+        hide_index=True,
+    )
+
 
-plot_df = df[["country", col]].dropna().set_index("country")
-st.bar_chart(plot_df, height=360)
+league_section(df)
@@ -1,23 +1,143 @@
 import streamlit as st
 import pandas as pd
 import os
+import plotly.express as px
+
+import frame_cache
+import profiling
+from macro_panel import (
+    INDICATOR_MAP,
+    PANEL_PATH,
+    add_cross_section_stats,
+    freeze,
+    league_table,
+    panel_matrix,
+    read_macro_csv,
+)
+from utils_ui import export_section, load_panel
 
 st.title("📈 Perbandingan Data Ekonomi Antar Negara")
 
+profiling.profile_this_run()
+
+SQL_EXAMPLE = """-- contoh: rata-rata & peringkat per region (join dengan metadata negara)
+SELECT
+    l.country,
+    c.region,
+    l.gdp_growth_pct,
+    avg(l.gdp_growth_pct) OVER (PARTITION BY c.region) AS region_avg,
+    rank() OVER (ORDER BY l.gdp_growth_pct DESC) AS peringkat
+FROM worldbank_latest l
+LEFT JOIN countries c USING (iso3)
+ORDER BY peringkat"""
+
+
+# ttl: kalau World Bank gagal (offline), tabel countries kosong hanya sampai
+# percobaan berikutnya, bukan sampai proses di-restart
+@st.cache_resource(show_spinner=False, ttl=10 * 60)
+def sql_engine_ready() -> str | None:
+    """Siapkan DuckDB + tabel countries. Return pesan warning (kalau ada)."""
+    import macro_sql
+    from utils_wb import fetch_countries
+
+    try:
+        macro_sql.register_countries(fetch_countries())
+    except Exception as e:
+        # tetap buat tabel kosong supaya query dengan join tidak error
+        macro_sql.register_countries(pd.DataFrame(columns=macro_sql.COUNTRY_COLS))
+        return f"Metadata negara (tabel `countries`) kosong, gagal ambil dari World Bank: {e}"
+    return None
+
+
+@frame_cache.cached
+def load_matrix(path: str, version: float, axis: str, kind: str, col: str | None) -> pd.DataFrame:
+    """Matriks per versi dataset (path + mtime); dihitung sekali, dipakai semua sesi."""
+    return panel_matrix(read_macro_csv(path), axis, kind, col)
+
+
+mode = st.radio("Mode", ["Sederhana", "Matriks korelasi", "Lanjutan (SQL)"], horizontal=True)
+
+if mode == "Matriks korelasi":
+    # panel lengkap kalau ada (korelasi antar negara butuh deret tahun)
+    src = PANEL_PATH if os.path.exists(PANEL_PATH) else "data/macro_indicators_worldbank_latest.csv"
+    st.caption(f"Sumber: `{src}`")
+
+    kind_map = {"Korelasi": "corr", "Kovarians": "cov", "Jarak (RMS)": "dist"}
+    axis_map = {"Antar indikator": "indicator", "Antar negara": "country"}
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        axis_label = st.radio("Dimensi", list(axis_map.keys()), horizontal=True)
+    with c2:
+        kind_label = st.radio("Ukuran", list(kind_map.keys()), horizontal=True)
+    axis = axis_map[axis_label]
+    m_col = None
+    if axis == "country":
+        with c3:
+            m_col = INDICATOR_MAP[st.selectbox("Indikator", list(INDICATOR_MAP.keys()), key="matrix_indicator")]
+
+    mat = load_matrix(src, os.path.getmtime(src), axis, kind_map[kind_label], m_col)
+
+    if mat.isna().all().all():
+        st.info("Data belum cukup (minimal 3 observasi per pasangan). Jalankan build_macro_csv_worldbank.py untuk panel lengkap.")
+        st.stop()
+
+    fig = px.imshow(
+        mat,
+        color_continuous_scale="RdBu_r" if kind_map[kind_label] == "corr" else "Viridis",
+        zmin=-1 if kind_map[kind_label] == "corr" else None,
+        zmax=1 if kind_map[kind_label] == "corr" else None,
+        aspect="auto",
+        title=f"{kind_label} {axis_label.lower()}",
+    )
+    fig.update_layout(height=max(420, 18 * len(mat)))
+    st.plotly_chart(fig, use_container_width=True)
+
+    with st.expander("Lihat matriks"):
+        st.dataframe(mat.round(3), use_container_width=True)
+    st.stop()
+
+if mode == "Lanjutan (SQL)":
+    try:
+        import macro_sql
+
+        warn = sql_engine_ready()
+    except ImportError:
+        st.error("Mode SQL butuh paket `duckdb` (pip install duckdb).")
+        st.stop()
+    if warn:
+        st.warning(warn)
+
+    st.caption("Tabel tersedia: " + ", ".join(f"`{t}`" for t in macro_sql.list_tables()))
+    sql = st.text_area("Query SQL (DuckDB)", SQL_EXAMPLE, height=220)
+
+    try:
+        res = macro_sql.run_sql(sql)
+    except Exception as e:
+        st.error(f"Query gagal: {e}")
+        st.stop()
+
+    st.dataframe(res, use_container_width=True)
+
+    num_cols = res.select_dtypes("number").columns.tolist()
+    label_cols = [c for c in res.columns if c not in num_cols]
+    if num_cols and label_cols:
+        y = st.selectbox("Kolom untuk grafik", num_cols)
+        st.bar_chart(res.set_index(label_cols[0])[y])
+    st.stop()
+
 PATH = "data/macro_indicators_worldbank_2024.csv"
 
 if not os.path.exists(PATH):
     st.error(f"File tidak ditemukan: {PATH}. Pastikan CSV ada di folder data/ pada repo GitHub.")
     st.stop()
 
-df = pd.read_csv(PATH)
+@frame_cache.cached
+def load_data(path: str) -> pd.DataFrame:
+    # rank / persentil / z-score per tahun dihitung sekali saat load pertama
+    return freeze(add_cross_section_stats(read_macro_csv(path)))
 
-# mapping label UI -> kolom data
-indicator_map = {
-    "GDP Growth (%)": "gdp_growth_pct",
-    "Inflation CPI (%)": "inflation_cpi_pct",
-    "Unemployment (%)": "unemployment_pct",
-}
+
+df = load_data(PATH)
 
 st.subheader("Pilih negara & indikator")
 countries = st.multiselect(
@@ -26,10 +146,10 @@ countries = st.multiselect(
     default=df["country"].unique().tolist()[:3],
 )
 
-label = st.selectbox("Pilih indikator", list(indicator_map.keys()))
-col = indicator_map[label]
+label = st.selectbox("Pilih indikator", list(INDICATOR_MAP.keys()))
+col = INDICATOR_MAP[label]
 
-dff = df[df["country"].isin(countries)].copy()
+dff = df[df["country"].isin(countries)]
 
 if dff.empty:
     st.warning("Tidak ada data untuk pilihan negara tersebut.")
@@ -39,8 +159,9 @@ st.subheader("Grafik Perbandingan")
 st.line_chart(dff.set_index("country")[col])
 
 st.subheader("Interpretasi singkat")
-max_row = dff.loc[dff[col].idxmax()]
-min_row = dff.loc[dff[col].idxmin()]
+# pakai rank yang sudah dihitung (1 = tertinggi)
+max_row = league_table(dff, col, 1).iloc[0]
+min_row = league_table(dff, col, 1, bottom=True).iloc[0]
 
 st.write(
     f"Untuk indikator **{label}**, nilai tertinggi adalah **{max_row['country']}** "
@@ -50,3 +171,33 @@ st.write(
 
 with st.expander("Lihat data yang dipakai"):
     st.dataframe(dff, use_container_width=True)
+
+export_section(dff, "perbandingan_negara", key="p3_export")
+
+# Tren antar tahun (butuh panel lengkap dari build_macro_csv_worldbank.py)
+
+# Fragment: ganti seri tren hanya rerun bagian ini
+@st.fragment
+def trend_section(panel: pd.DataFrame, countries: list[str], col: str) -> None:
+    st.subheader("Tren antar tahun")
+
+    # kolom turunan sudah dihitung saat build, tinggal dipilih
+    trend_map = {
+        "Nilai": col,
+        "Perubahan YoY": f"{col}_yoy",
+        "Rata-rata 3 tahun": f"{col}_avg3",
+        "Rata-rata 5 tahun": f"{col}_avg5",
+        "Persentil antar negara": f"{col}_pctl",
+    }
+    trend_label = st.radio("Seri", list(trend_map.keys()), horizontal=True)
+    trend_col = trend_map[trend_label]
+
+    trend_df = panel[panel["country"].isin(countries)]
+    if trend_col in trend_df.columns and not trend_df.empty:
+        st.line_chart(trend_df.pivot(index="year", columns="country", values=trend_col))
+    else:
+        st.info("Seri ini belum ada di file panel. Jalankan ulang build_macro_csv_worldbank.py.")
+
+
+if os.path.exists(PANEL_PATH):
+    trend_section(load_panel(PANEL_PATH), countries, col)
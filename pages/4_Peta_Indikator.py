@@ -0,0 +1,128 @@
+import json
+import os
+
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+
+import frame_cache
+import profiling
+from macro_panel import ASEAN_ISO3, INDICATOR_MAP, VALUE_COLS, freeze, read_macro_csv
+
+st.set_page_config(page_title="Peta Indikator Makro", page_icon="🗺️", layout="wide")
+
+profiling.profile_this_run()
+
+DATA_PATH = "data/macro_indicators_worldbank_latest.csv"
+
+# batas negara Natural Earth 1:110m, sudah disederhanakan (build_geometries.py)
+GEO_DIR = "static/geo"
+GEO_LEVELS = {"Rendah (cepat)": "low", "Sedang": "mid", "Tinggi": "high"}
+
+
+@frame_cache.cached
+def load_data(path: str) -> pd.DataFrame:
+    return freeze(read_macro_csv(path))
+
+
+@st.cache_resource
+def load_geometry(level: str) -> tuple[dict, frozenset]:
+    """
+    GeoJSON satu level detail, dibaca sekali per proses.
+    Return: (FeatureCollection, iso3 yang punya geometri)
+    """
+    with open(os.path.join(GEO_DIR, f"countries_{level}.geojson"), encoding="utf-8") as f:
+        fc = json.load(f)
+    return fc, frozenset(feat["id"] for feat in fc["features"])
+
+
+def geometry_source(level: str):
+    """
+    Dengan server.enableStaticServing, plotly mengambil GeoJSON lewat URL
+    (sekali, di-cache browser) dan figure per rerun hanya berisi nilai.
+    Tanpa static serving, dict dari cache proses disisipkan ke figure.
+    """
+    if st.get_option("server.enableStaticServing"):
+        return f"app/{GEO_DIR}/countries_{level}.geojson"
+    return load_geometry(level)[0]
+
+
+st.title("🗺️ Peta Indikator Makro")
+st.caption("Nilai terbaru per negara (World Bank). Batas negara: Natural Earth 1:110m (public domain).")
+
+try:
+    df = load_data(DATA_PATH)
+except FileNotFoundError:
+    st.error(f"File tidak ketemu: {DATA_PATH}. Jalankan build_macro_csv_worldbank.py dulu.")
+    st.stop()
+
+missing = [c for c in ["country", "iso3", "year"] + VALUE_COLS if c not in df.columns]
+if missing:
+    st.error(f"Kolom wajib tidak ada di CSV: {missing}")
+    st.stop()
+
+try:
+    _, geo_ids = load_geometry("low")
+except FileNotFoundError:
+    st.error(f"File geometri tidak ada di {GEO_DIR}/. Jalankan build_geometries.py dulu.")
+    st.stop()
+
+
+@st.fragment
+def choropleth_section(df: pd.DataFrame) -> None:
+    # fragment: ganti indikator / cakupan hanya menjalankan ulang peta
+    c1, c2, c3 = st.columns(3)
+    label = c1.selectbox("Indikator", list(INDICATOR_MAP.keys()), key="map_indicator")
+    col = INDICATOR_MAP[label]
+    scope = c2.radio("Cakupan", ["Dunia", "ASEAN"], horizontal=True, key="map_scope")
+    # dunia: detail rendah cukup; ASEAN di-zoom -> detail tinggi
+    detail = c3.radio(
+        "Detail batas",
+        list(GEO_LEVELS),
+        index=0 if scope == "Dunia" else 2,
+        horizontal=True,
+        key=f"map_detail_{scope}",
+    )
+
+    view = df[df[col].notna()]
+    if scope == "ASEAN":
+        view = view[view["iso3"].isin(ASEAN_ISO3)]
+
+    no_shape = sorted(view.loc[~view["iso3"].isin(geo_ids), "country"])
+    view = view[view["iso3"].isin(geo_ids)]
+    if view.empty:
+        st.info("Tidak ada negara dengan data dan geometri untuk pilihan ini.")
+        return
+
+    fig = go.Figure(
+        go.Choropleth(
+            geojson=geometry_source(GEO_LEVELS[detail]),
+            featureidkey="id",
+            locations=view["iso3"],
+            z=view[col],
+            text=view["country"],
+            customdata=view["year"],
+            hovertemplate="%{text}<br>%{z:.2f}<br>Tahun %{customdata}<extra></extra>",
+            colorscale="RdYlGn_r" if col != "gdp_growth_pct" else "RdYlGn",
+            colorbar_title=label,
+            marker_line_width=0.5,
+        )
+    )
+    fig.update_geos(
+        fitbounds="locations" if scope == "ASEAN" else False,
+        showcountries=False,
+        showcoastlines=False,
+        showframe=False,
+        projection_type="natural earth",
+        # negara tanpa data tetap terlihat sebagai daratan abu-abu
+        showland=True,
+        landcolor="#e5e5e5",
+    )
+    fig.update_layout(height=560, margin=dict(l=0, r=0, t=10, b=0))
+    st.plotly_chart(fig, use_container_width=True)
+
+    if no_shape:
+        st.caption(f"Terlalu kecil untuk skala 1:110m (tidak tampil di peta): {', '.join(no_shape)}")
+
+
+choropleth_section(df)
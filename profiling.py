@@ -0,0 +1,188 @@
+"""
+Opt-in sampling profiler for Streamlit reruns.
+
+Switch on with env DASH_PROFILE=1 (all sessions) or ?profile=1 in the URL
+(one session). Each page calls profile_this_run() at the top; a background
+thread then samples the script thread's stack every DASH_PROFILE_INTERVAL
+seconds until the rerun finishes, and writes a JSON summary (top-N hot
+functions, cumulative times, hottest call stacks, timings of @track'ed
+loaders, frame_cache counters) to DASH_PROFILE_DIR. View them with
+`streamlit run diagnostics.py`.
+
+When switched off, profile_this_run() and @track cost one check each.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import frame_cache
+
+PROFILE_DIR = os.environ.get("DASH_PROFILE_DIR", ".profiles")
+INTERVAL = float(os.environ.get("DASH_PROFILE_INTERVAL", "0.005"))
+TOP_N = 25
+TOP_STACKS = 10
+KEEP_FILES = 200
+MAX_SECONDS = 600
+
+# thread ident -> sampler of the rerun running on that thread
+_active: dict[int, "_Sampler"] = {}
+
+
+def enabled() -> bool:
+    if os.environ.get("DASH_PROFILE") == "1":
+        return True
+    try:
+        import streamlit as st
+
+        return st.query_params.get("profile") == "1"
+    except Exception:
+        return False
+
+
+def _frame_key(code) -> str:
+    return f"{code.co_name} ({os.path.relpath(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, name: str, ident: int, root_frame):
+        super().__init__(name=f"profiler-{name}", daemon=True)
+        self.script = name
+        self.target_ident = ident
+        # the page's module frame (not its code: Streamlit reuses compiled code across reruns)
+        self.root_frame = root_frame
+        self.stop = threading.Event()
+        self.samples: Counter[tuple[str, ...]] = Counter()
+        self.loader_calls: list[dict] = []
+        self.started = datetime.now()
+
+    def _stack(self) -> tuple[str, ...] | None:
+        """Stack of the script thread, root first; None once the script is done."""
+        frame = sys._current_frames().get(self.target_ident)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_key(frame.f_code))
+            if frame is self.root_frame:
+                return tuple(reversed(stack))
+            frame = frame.f_back
+        return None
+
+    def run(self) -> None:
+        t0 = time.perf_counter()
+        try:
+            while not self.stop.is_set() and time.perf_counter() - t0 < MAX_SECONDS:
+                stack = self._stack()
+                if stack is None:
+                    break
+                self.samples[stack] += 1
+                time.sleep(INTERVAL)
+        finally:
+            if _active.get(self.target_ident) is self:
+                _active.pop(self.target_ident, None)
+            self.root_frame = None
+            self.save(time.perf_counter() - t0)
+
+    def summary(self, wall: float) -> dict:
+        total = sum(self.samples.values())
+        per_sample = wall / total if total else 0.0
+
+        self_counts: Counter[str] = Counter()
+        cum_counts: Counter[str] = Counter()
+        for stack, n in self.samples.items():
+            self_counts[stack[-1]] += n
+            for fn in set(stack):
+                cum_counts[fn] += n
+
+        top = [
+            {
+                "function": fn,
+                "self_s": round(self_counts[fn] * per_sample, 4),
+                "cum_s": round(n * per_sample, 4),
+                "cum_pct": round(100 * n / total, 1),
+            }
+            for fn, n in cum_counts.most_common(TOP_N)
+        ]
+        stacks = [
+            {"samples": n, "seconds": round(n * per_sample, 4), "stack": list(stack)}
+            for stack, n in self.samples.most_common(TOP_STACKS)
+        ]
+        return {
+            "script": self.script,
+            "started": self.started.isoformat(timespec="seconds"),
+            "wall_s": round(wall, 4),
+            "samples": total,
+            "interval_s": INTERVAL,
+            "top": top,
+            "stacks": stacks,
+            "loaders": self.loader_calls,
+            # process-wide counters of the shared data cache at the end of this rerun
+            "caches": frame_cache.stats(),
+            "cache_budget_bytes": frame_cache.MAX_BYTES,
+        }
+
+    def save(self, wall: float) -> None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = self.started.strftime("%Y%m%d-%H%M%S-%f")
+        base = os.path.splitext(os.path.basename(self.script))[0]
+        path = os.path.join(PROFILE_DIR, f"{stamp}_{base}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.summary(wall), f, indent=1)
+        _prune()
+
+
+def _prune() -> None:
+    files = sorted(list_profiles())
+    for fn in files[:-KEEP_FILES]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, fn))
+        except OSError:
+            pass
+
+
+def profile_this_run(name: str | None = None) -> None:
+    """Call at the top of a page script; profiles the rest of this rerun if enabled."""
+    if not enabled():
+        return
+    ident = threading.get_ident()
+    previous = _active.get(ident)
+    if previous is not None:
+        previous.stop.set()
+    caller = sys._getframe(1)
+    sampler = _Sampler(name or os.path.relpath(caller.f_code.co_filename), ident, caller)
+    _active[ident] = sampler
+    sampler.start()
+
+
+def track(fn):
+    """Record wall time of a data loader in the current rerun's profile."""
+    label = f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        sampler = _active.get(threading.get_ident())
+        if sampler is None:
+            return fn(*args, **kwargs)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            sampler.loader_calls.append({"function": label, "seconds": round(time.perf_counter() - t0, 4)})
+    return wrapper
+
+
+def list_profiles() -> list[str]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    return [fn for fn in os.listdir(PROFILE_DIR) if fn.endswith(".json")]
+
+
+def read_profile(fn: str) -> dict:
+    with open(os.path.join(PROFILE_DIR, fn), encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,319 @@
+"""
+Local read-only query API over the CSVs in data/.
+
+Run:
+  python query_api.py --port 8600
+
+Endpoints:
+  GET /datasets
+      List datasets with their version (ETag) and columns.
+  GET /data/<dataset>?country=IDN,USA&indicator=gdp_growth_pct&year=2020
+                     &year_from=2015&year_to=2024&limit=100&offset=0&format=json|arrow
+      Filters (country = iso3, indicator = value column, year / year range) are
+      applied on the in-memory frame before anything is serialised.
+      Responses carry an ETag; send If-None-Match to get 304 Not Modified.
+      format=arrow returns an Arrow IPC stream (needs pyarrow).
+  GET /export/<dataset>?format=csv|parquet|xlsx
+      Whole file, read and encoded in chunks (macro_export): CSV is sent with
+      chunked transfer encoding, Parquet / Excel from a temp file on disk.
+
+Datasets are loaded once per process with the same loader as the dashboard
+(macro_panel.read_macro_csv) and reloaded only when the file changes on disk.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+import macro_export
+from macro_panel import freeze, read_macro_csv
+
+DATA_DIR = "data"
+ID_COLS = ["country", "iso3", "year"]
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 20000
+RESPONSE_CACHE_SIZE = 256
+
+
+class QueryError(ValueError):
+    pass
+
+
+# =========================
+# Datasets (one hot copy per process)
+# =========================
+_datasets: dict[str, tuple[str, pd.DataFrame]] = {}
+_datasets_lock = threading.Lock()
+
+
+def dataset_paths() -> dict[str, str]:
+    """dataset name -> path, e.g. macro_indicators_worldbank_latest -> data/....csv"""
+    out = {}
+    for fn in sorted(os.listdir(DATA_DIR)):
+        if fn.endswith(".csv"):
+            out[fn[:-4]] = os.path.join(DATA_DIR, fn)
+    return out
+
+
+def _file_version(path: str) -> str:
+    st_ = os.stat(path)
+    return hashlib.sha1(f"{path}:{st_.st_mtime_ns}:{st_.st_size}".encode()).hexdigest()[:16]
+
+
+def get_dataset(name: str) -> tuple[str, pd.DataFrame]:
+    """Return (version, frame); reload only if the file changed."""
+    path = dataset_paths().get(name)
+    if path is None:
+        raise KeyError(name)
+
+    version = _file_version(path)
+    with _datasets_lock:
+        cached = _datasets.get(name)
+        if cached is None or cached[0] != version:
+            cached = (version, freeze(read_macro_csv(path)))
+            _datasets[name] = cached
+    return cached
+
+
+# =========================
+# Query
+# =========================
+def _split(values: list[str]) -> list[str]:
+    return [v.strip() for item in values for v in item.split(",") if v.strip()]
+
+
+def _int_param(qs: dict, key: str, default: int | None = None) -> int | None:
+    if key not in qs:
+        return default
+    try:
+        return int(qs[key][-1])
+    except ValueError:
+        raise QueryError(f"'{key}' must be an integer")
+
+
+def run_query(df: pd.DataFrame, qs: dict) -> tuple[pd.DataFrame, int]:
+    """
+    Apply filters, column projection and pagination.
+    Return: (page frame, total matching rows)
+    """
+    mask = pd.Series(True, index=df.index)
+
+    countries = [c.upper() for c in _split(qs.get("country", []))]
+    if countries:
+        mask &= df["iso3"].str.upper().isin(countries)
+
+    try:
+        years = [int(y) for y in _split(qs.get("year", []))]
+    except ValueError:
+        raise QueryError("'year' must be integer(s)")
+    if years:
+        mask &= df["year"].isin(years)
+    year_from = _int_param(qs, "year_from")
+    if year_from is not None:
+        mask &= df["year"] >= year_from
+    year_to = _int_param(qs, "year_to")
+    if year_to is not None:
+        mask &= df["year"] <= year_to
+
+    indicators = _split(qs.get("indicator", []))
+    unknown = [c for c in indicators if c not in df.columns or c in ID_COLS]
+    if unknown:
+        raise QueryError(f"Unknown indicator(s): {unknown}")
+    cols = [c for c in ID_COLS if c in df.columns] + (indicators or [c for c in df.columns if c not in ID_COLS])
+
+    limit = min(_int_param(qs, "limit", DEFAULT_LIMIT), MAX_LIMIT)
+    offset = _int_param(qs, "offset", 0)
+    # limit=0 would give next_offset == offset forever
+    if limit < 1 or offset < 0:
+        raise QueryError("'limit' must be >= 1 and 'offset' >= 0")
+
+    hit = df.loc[mask, cols]
+    return hit.iloc[offset:offset + limit], len(hit)
+
+
+def _to_json(page: pd.DataFrame, total: int, offset: int, limit: int) -> bytes:
+    nxt = offset + len(page)
+    body = {
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "next_offset": nxt if nxt < total else None,
+        "rows": json.loads(page.to_json(orient="records")),
+    }
+    return json.dumps(body).encode()
+
+
+def _to_arrow(page: pd.DataFrame) -> bytes:
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(page, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+# =========================
+# Response cache (ETag -> body)
+# =========================
+_responses: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+_responses_lock = threading.Lock()
+
+
+def _cache_get(etag: str):
+    with _responses_lock:
+        hit = _responses.get(etag)
+        if hit is not None:
+            _responses.move_to_end(etag)
+        return hit
+
+
+def _cache_put(etag: str, value: tuple[str, bytes]) -> None:
+    with _responses_lock:
+        _responses[etag] = value
+        _responses.move_to_end(etag)
+        while len(_responses) > RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "macro-query-api/1.0"
+    # HTTP/1.1 for chunked export responses; every other response sets Content-Length
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "application/json", etag: str | None = None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", f'"{etag}"')
+            self.send_header("Cache-Control", "no-cache")
+        if body:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _error(self, status: int, msg: str):
+        self._send(status, json.dumps({"error": msg}).encode())
+
+    def _export(self, name: str, qs: dict):
+        path = dataset_paths().get(name)
+        if path is None:
+            return self._error(404, f"Unknown dataset: {name}")
+        fmt = (qs.get("format") or ["csv"])[-1]
+        if fmt not in macro_export.FORMATS:
+            return self._error(400, f"format must be one of {list(macro_export.FORMATS)}")
+        if not macro_export.can_export(fmt):
+            return self._error(406, f"format={fmt} needs an optional package (pyarrow / openpyxl)")
+
+        content_type = macro_export.FORMATS[fmt][0]
+        filename = macro_export.export_name(path, fmt)
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+
+        if fmt == "csv":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            if self.command == "HEAD":
+                # headers only: any body bytes would corrupt the keep-alive connection
+                return
+            for b in macro_export.iter_csv_bytes(macro_export.iter_file(path)):
+                self.wfile.write(f"{len(b):X}\r\n".encode() + b + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        if self.command == "HEAD":
+            # size is only known after encoding the whole file; not worth it for HEAD
+            self.end_headers()
+            return
+
+        with macro_export.write_export(macro_export.iter_file(path), fmt) as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(0)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            for b in macro_export.iter_file_bytes(f):
+                self.wfile.write(b)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+
+        if parts == ["datasets"]:
+            out = []
+            for name in dataset_paths():
+                version, df = get_dataset(name)
+                out.append({"name": name, "version": version, "rows": len(df), "columns": list(df.columns)})
+            return self._send(200, json.dumps(out).encode())
+
+        if len(parts) == 2 and parts[0] == "export":
+            return self._export(parts[1], parse_qs(url.query))
+
+        if len(parts) != 2 or parts[0] != "data":
+            return self._error(404, "Use /datasets, /data/<dataset> or /export/<dataset>")
+
+        try:
+            version, df = get_dataset(parts[1])
+        except KeyError:
+            return self._error(404, f"Unknown dataset: {parts[1]}")
+
+        qs = parse_qs(url.query)
+        fmt = (qs.get("format") or ["json"])[-1]
+        if fmt not in ("json", "arrow"):
+            return self._error(400, "format must be json or arrow")
+
+        # ETag = dataset version + normalised query
+        norm = json.dumps(sorted((k, sorted(v)) for k, v in qs.items()))
+        etag = hashlib.sha1(f"{parts[1]}:{version}:{norm}".encode()).hexdigest()
+
+        if self.headers.get("If-None-Match", "").strip('"') == etag:
+            return self._send(304, etag=etag)
+
+        cached = _cache_get(etag)
+        if cached is None:
+            try:
+                page, total = run_query(df, qs)
+                if fmt == "arrow":
+                    cached = ("application/vnd.apache.arrow.stream", _to_arrow(page))
+                else:
+                    offset = _int_param(qs, "offset", 0)
+                    limit = min(_int_param(qs, "limit", DEFAULT_LIMIT), MAX_LIMIT)
+                    cached = ("application/json", _to_json(page, total, offset, limit))
+            except QueryError as e:
+                return self._error(400, str(e))
+            except ImportError:
+                return self._error(406, "format=arrow needs pyarrow installed")
+            _cache_put(etag, cached)
+
+        content_type, body = cached
+        self._send(200, body, content_type, etag=etag)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    args = ap.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving {DATA_DIR}/ on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
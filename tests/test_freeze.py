@@ -0,0 +1,73 @@
+import pandas as pd
+import pytest
+
+from macro_panel import FrozenFrame, freeze
+
+
+@pytest.fixture
+def df():
+    raw = pd.DataFrame(
+        {
+            "country": pd.array(["Indonesia", "Malaysia"], dtype="string"),
+            "iso3": ["IDN", "MYS"],
+            "year": [2024, 2024],
+            "gdp_growth_pct": [5.0, None],
+        }
+    )
+    return freeze(raw)
+
+
+WRITES = {
+    "setitem new column": lambda d: d.__setitem__("interpretasi", "x"),
+    "setitem existing": lambda d: d.__setitem__("year", 1),
+    "loc string cell": lambda d: d.loc.__setitem__((0, "country"), "HACK"),
+    "iloc": lambda d: d.iloc.__setitem__((0, 2), 1),
+    "at": lambda d: d.at.__setitem__((0, "iso3"), "XXX"),
+    "iat": lambda d: d.iat.__setitem__((0, 0), "HACK"),
+    "del": lambda d: d.__delitem__("year"),
+    "insert": lambda d: d.insert(0, "z", 1),
+    "pop": lambda d: d.pop("year"),
+    "fillna inplace": lambda d: d.fillna(0, inplace=True),
+    "replace inplace": lambda d: d.replace(2024, 1, inplace=True),
+    "where inplace": lambda d: d.where(d.isna(), inplace=True),
+    "drop inplace": lambda d: d.drop(columns="year", inplace=True),
+    "sort inplace": lambda d: d.sort_values("iso3", ascending=False, inplace=True),
+    "columns": lambda d: setattr(d, "columns", list("abcd")),
+    "index": lambda d: setattr(d, "index", [5, 6]),
+    "column attribute": lambda d: setattr(d, "year", 1),
+    "update": lambda d: d.update(pd.DataFrame({"year": [1]})),
+}
+
+
+@pytest.mark.parametrize("write", WRITES.values(), ids=WRITES.keys())
+def test_writes_raise_and_leave_frame_intact(df, write):
+    before = df.copy()
+    with pytest.raises((TypeError, ValueError)):
+        write(df)
+    pd.testing.assert_frame_equal(df, before, check_frame_type=False)
+
+
+def test_numpy_views_are_read_only(df):
+    with pytest.raises(ValueError):
+        df["year"].to_numpy()[0] = 1
+
+
+def test_derived_frames_are_plain_and_writable(df):
+    view = df[df["year"] == 2024]
+    assert type(view) is pd.DataFrame
+    view["interpretasi"] = "ok"
+    view.loc[0, "country"] = "changed"
+    assert df.loc[0, "country"] == "Indonesia"
+    assert "interpretasi" not in df.columns
+    assert type(df.assign(a=1)) is pd.DataFrame
+    assert type(df.copy()) is pd.DataFrame
+
+
+def test_freeze_series_and_idempotent(df):
+    s = freeze(df["year"])
+    with pytest.raises(TypeError):
+        s.iloc[0] = 1
+    with pytest.raises(TypeError):
+        s.name = "x"
+    assert freeze(df) is df
+    assert isinstance(df, FrozenFrame)
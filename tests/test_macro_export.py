@@ -0,0 +1,45 @@
+import io
+import os
+
+import pandas as pd
+import pytest
+from streamlit.runtime.download_data_util import convert_data_to_bytes_and_infer_mime
+
+import macro_export
+from macro_export import FORMATS, can_export, iter_frame, write_export
+
+DF = pd.DataFrame({"country": ["Indonesia", "Japan", "Chile"], "year": [2023, 2023, 2023], "gdp_growth_pct": [5.0, None, 0.2]})
+
+
+@pytest.mark.parametrize("fmt", list(FORMATS))
+def test_download_button_accepts_export(fmt):
+    if not can_export(fmt):
+        pytest.skip(f"{fmt} needs an optional package")
+    # same deferred callable as utils_ui.export_section passes as data=
+    data = lambda: write_export(iter_frame(DF, chunk_rows=2), fmt)
+    out = data()
+    path = out._path
+    raw, _ = convert_data_to_bytes_and_infer_mime(out, RuntimeError("unsupported"))
+
+    if fmt == "csv":
+        back = pd.read_csv(io.BytesIO(raw))
+    elif fmt == "parquet":
+        back = pd.read_parquet(io.BytesIO(raw))
+    else:
+        back = pd.read_excel(io.BytesIO(raw))
+    assert back["country"].tolist() == DF["country"].tolist()
+
+    out.close()
+    assert not os.path.exists(path)
+
+
+def test_failed_export_leaves_no_temp_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(macro_export.tempfile, "tempdir", str(tmp_path))
+
+    def broken():
+        yield DF
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        write_export(broken(), "csv")
+    assert os.listdir(tmp_path) == []
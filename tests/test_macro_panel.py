@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from macro_panel import DERIVED_COLS, VALUE_COLS, derive_metrics
+
+
+def _panel(n_countries: int = 6, years=range(2000, 2015), seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = [(f"Country {i}", f"C{i:02d}", y) for i in range(n_countries) for y in years]
+    df = pd.DataFrame(rows, columns=["country", "iso3", "year"])
+    for col in VALUE_COLS:
+        df[col] = np.where(rng.random(len(df)) < 0.1, np.nan, rng.normal(3, 2, len(df)))
+    return df
+
+
+def _assert_same(incremental: pd.DataFrame, full: pd.DataFrame) -> None:
+    pd.testing.assert_frame_equal(
+        incremental[["iso3", "year"] + DERIVED_COLS],
+        full[["iso3", "year"] + DERIVED_COLS],
+        check_dtype=False,
+    )
+
+
+def _append(raw):
+    extra = _panel(years=range(2015, 2017), seed=1)
+    return pd.concat([raw, extra], ignore_index=True)
+
+
+def _revise(raw):
+    out = raw.copy()
+    out.loc[(out["iso3"] == "C02") & (out["year"] == 2006), "gdp_growth_pct"] = 42.0
+    return out
+
+
+def _delete_row(raw):
+    return raw[~((raw["iso3"] == "C03") & (raw["year"] == 2008))]
+
+
+def _delete_country(raw):
+    return raw[raw["iso3"] != "C05"]
+
+
+@pytest.mark.parametrize("change", [_append, _revise, _delete_row, _delete_country])
+def test_incremental_matches_full_recompute(change):
+    raw = _panel()
+    previous = derive_metrics(raw)
+    changed = change(raw)
+    _assert_same(derive_metrics(changed, previous), derive_metrics(changed))
+
+
+def test_unchanged_panel_reuses_previous():
+    raw = _panel()
+    previous = derive_metrics(raw)
+    _assert_same(derive_metrics(raw, previous), previous)
@@ -0,0 +1,68 @@
+import os
+
+import duckdb
+import pandas as pd
+import pytest
+
+import macro_sql
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module", autouse=True)
+def repo_cwd():
+    # views point at data/... relative to the repo root
+    old = os.getcwd()
+    os.chdir(ROOT)
+    yield
+    os.chdir(old)
+
+
+def test_views_over_data_files():
+    assert "worldbank_latest" in macro_sql.list_tables()
+    out = macro_sql.run_sql("SELECT count(*) AS n FROM worldbank_latest")
+    assert out["n"].iloc[0] > 0
+
+
+def test_countries_table_can_be_registered():
+    macro_sql.register_countries(pd.DataFrame({"iso3": ["IDN"], "country": ["Indonesia"]}))
+    assert macro_sql.run_sql("SELECT iso3 FROM countries")["iso3"].tolist() == ["IDN"]
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "SELECT * FROM read_text('/etc/hostname')",
+        "SELECT * FROM read_csv('/etc/passwd')",
+        "SELECT * FROM read_csv_auto('data/../requests.jsonl')",
+        "SELECT * FROM read_text('https://example.com/')",
+        "WITH t AS (SELECT 1) SELECT * FROM read_text('/proc/self/environ')",
+    ],
+)
+def test_files_outside_data_are_rejected(sql):
+    with pytest.raises(duckdb.PermissionException):
+        macro_sql.run_sql(sql)
+
+
+def test_configuration_is_locked():
+    cur = macro_sql._connection().cursor()
+    with pytest.raises(duckdb.Error):
+        cur.execute("SET enable_external_access = true")
+
+
+@pytest.mark.parametrize("sql", ["DROP VIEW worldbank_latest", "SELECT 1; SELECT 2", "COPY countries TO 'x.csv'"])
+def test_non_select_is_rejected(sql):
+    with pytest.raises(ValueError):
+        macro_sql.run_sql(sql)
+
+
+def test_files_added_later_become_views():
+    path = os.path.join(ROOT, "data", "macro_indicators_tmp_later.csv")
+    macro_sql.list_tables()
+    try:
+        pd.DataFrame({"iso3": ["IDN"], "year": [2024]}).to_csv(path, index=False)
+        assert "tmp_later" in macro_sql.list_tables()
+        assert macro_sql.run_sql("SELECT iso3 FROM tmp_later")["iso3"].tolist() == ["IDN"]
+    finally:
+        os.remove(path)
+    assert "tmp_later" not in macro_sql.list_tables()
@@ -0,0 +1,55 @@
+import http.client
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import query_api
+
+DATASET = "macro_indicators_worldbank_latest"
+
+
+@pytest.fixture(scope="module")
+def conn():
+    # data/ relative to the repo root, not the cwd pytest was started from
+    query_api.DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), query_api.Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    c = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+    yield c
+    c.close()
+    server.shutdown()
+
+
+def _get(conn, path, method="GET"):
+    conn.request(method, path)
+    resp = conn.getresponse()
+    return resp, resp.read()
+
+
+@pytest.mark.parametrize("query", ["year=abc", "year=2020,x", "limit=0", "limit=-1", "offset=-1"])
+def test_bad_params_are_rejected(conn, query):
+    resp, body = _get(conn, f"/data/{DATASET}?{query}")
+    assert resp.status == 400
+    assert "error" in json.loads(body)
+
+
+def test_year_filter(conn):
+    resp, body = _get(conn, f"/data/{DATASET}?year=2024&limit=1")
+    out = json.loads(body)
+    assert resp.status == 200
+    assert out["rows"][0]["year"] == 2024
+    assert out["next_offset"] in (None, 1)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet"])
+def test_head_export_sends_no_body(conn, fmt):
+    resp, body = _get(conn, f"/export/{DATASET}?format={fmt}", method="HEAD")
+    assert resp.status == 200
+    assert body == b""
+    # the keep-alive connection is still usable afterwards
+    resp, body = _get(conn, "/datasets")
+    assert resp.status == 200
+    assert DATASET in body.decode()
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+import pandas as pd
+
+import frame_cache
+import utils_wb
+
+
+def test_group_aggregates_reuse_default_load_all_data(monkeypatch):
+    calls = []
+
+    def fake_load(start_year, end_year):
+        calls.append((start_year, end_year))
+        return pd.DataFrame(
+            {
+                "iso3": ["IDN", "MYS"],
+                "year": [2020, 2020],
+                "value": [1.0, 3.0],
+                "indicator": ["x", "x"],
+                "indicator_code": ["X", "X"],
+                "unit": ["u", "u"],
+                "region": ["EAP", "EAP"],
+                "income": ["LMC", "UMC"],
+            }
+        )
+
+    monkeypatch.setattr(utils_wb, "_load_all_data", fake_load)
+    monkeypatch.setattr(utils_wb, "fetch_indicator", lambda *a: pd.DataFrame())
+    frame_cache.clear()
+
+    utils_wb.load_all_data()
+    utils_wb.load_all_data(1990, datetime.now().year)
+    agg = utils_wb.load_group_aggregates()
+
+    assert calls == [(1990, datetime.now().year)]
+    assert set(agg["group"]) == {"EAP", "LMC", "UMC"}
+    frame_cache.clear()
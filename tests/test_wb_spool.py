@@ -0,0 +1,108 @@
+import os
+import threading
+import time
+
+import pytest
+
+import utils_wb
+import wb_spool
+
+URL = "https://api.example/indicator/X"
+PARAMS = {"format": "json", "per_page": 2, "date": "2000:2001", "page": 1}
+
+
+def _payload(page: int, pages: int = 2):
+    return [{"page": page, "pages": pages}, [{"countryiso3code": "IDN", "date": str(1999 + page), "value": page}]]
+
+
+def test_stale_spool_is_discarded(tmp_path):
+    folder = tmp_path / wb_spool.fingerprint(URL, PARAMS)
+    folder.mkdir()
+    # an old, failed pull: page 1 said 3 pages, page 2 is from that pull
+    wb_spool._write_atomic(str(folder / "page_1.json"), _payload(1, pages=3))
+    wb_spool._write_atomic(str(folder / "page_2.json"), ["old"])
+    old = time.time() - 2 * 3600
+    os.utime(folder / "page_1.json", (old, old))
+
+    calls = []
+
+    def get_json(url, params):
+        calls.append(params["page"])
+        return _payload(params["page"])
+
+    pages = wb_spool.fetch_pages(URL, PARAMS, get_json, spool_dir=str(tmp_path), max_age=3600)
+    assert calls == [1, 2]
+    assert pages == [_payload(1), _payload(2)]
+
+
+def test_fresh_spool_is_resumed(tmp_path):
+    folder = tmp_path / wb_spool.fingerprint(URL, PARAMS)
+    wb_spool._write_atomic(str(folder / "page_1.json"), _payload(1))
+
+    calls = []
+
+    def get_json(url, params):
+        calls.append(params["page"])
+        return _payload(params["page"])
+
+    wb_spool.fetch_pages(URL, PARAMS, get_json, spool_dir=str(tmp_path))
+    assert calls == [2]
+
+
+def test_write_tolerates_removed_folder(tmp_path):
+    path = tmp_path / "gone" / "page_1.json"
+    wb_spool._write_atomic(str(path), _payload(1))
+    assert path.exists()
+    assert [p for p in os.listdir(path.parent) if p.endswith(".tmp")] == []
+
+
+def test_concurrent_fetch_indicator_shares_one_pull(tmp_path, monkeypatch):
+    monkeypatch.setattr(wb_spool, "SPOOL_DIR", str(tmp_path))
+
+    calls = []
+
+    def fake_http(url, params):
+        calls.append(params["page"])
+        time.sleep(0.05)
+        return _payload(params["page"])
+
+    monkeypatch.setattr(utils_wb, "_http_get_json", fake_http)
+
+    results, errors = [], []
+    barrier = threading.Barrier(4)
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(utils_wb.fetch_indicator("X", 2000, 2001))
+        except Exception as e:  # pragma: no cover - the failure being tested
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    assert sorted(calls) == [1, 2]
+    assert all(len(df) == 2 for df in results)
+    # spool cleared by the leader once everything was in memory
+    assert os.listdir(tmp_path) == []
+
+
+def test_error_body_is_not_spooled(tmp_path):
+    error = [{"message": [{"id": "120", "key": "Invalid value", "value": "The provided parameter value is not valid"}]}]
+    calls = []
+
+    def get_json(url, params):
+        calls.append(params["page"])
+        return error if len(calls) == 1 else _payload(params["page"])
+
+    assert wb_spool.fetch_pages(URL, PARAMS, get_json, spool_dir=str(tmp_path)) == [error]
+    assert not os.path.exists(os.path.join(tmp_path, wb_spool.fingerprint(URL, PARAMS), "page_1.json"))
+
+    # the rerun asks the API again instead of replaying the error
+    pages = wb_spool.fetch_pages(URL, PARAMS, get_json, spool_dir=str(tmp_path))
+    assert calls == [1, 1, 2]
+    assert pages == [_payload(1), _payload(2)]
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import streamlit as st
+import pandas as pd
+
+import frame_cache
+from macro_export import FORMATS, can_export, export_name, iter_file, iter_frame, write_export
+from macro_panel import PANEL_PATH, freeze, full_panel_path, read_macro_csv
+
+# alamat query_api.py untuk unduhan besar, mis. http://localhost:8600
+QUERY_API_URL = os.environ.get("DASH_QUERY_API_URL", "").rstrip("/")
+
+PAGE_SIZES = [25, 50, 100, 250]
+NO_SORT = "(urutan asli)"
+
+
+# =========================
+# Loader data yang dipakai beberapa halaman
+# =========================
+@frame_cache.cached
+def load_panel(path: str) -> pd.DataFrame:
+    """Panel lengkap (semua tahun); satu entri cache untuk semua halaman."""
+    return freeze(read_macro_csv(path))
+
+
+# =========================
+# Helpers UI yang dipakai beberapa halaman
+# =========================
+@st.fragment
+def export_section(selection: pd.DataFrame, name: str, key: str) -> None:
+    """
+    Tombol unduh pilihan saat ini / panel lengkap (CSV, Parquet, Excel).
+    File dibuat per chunk hanya saat tombol diklik, bukan tiap rerun.
+    """
+    with st.expander("⬇️ Unduh data"):
+        formats = [f for f in FORMATS if can_export(f)]
+        fmt = st.radio("Format", formats, horizontal=True, key=f"{key}_fmt")
+
+        panel_path = full_panel_path()
+        scopes = ["Pilihan saat ini"] + (["Panel lengkap (semua tahun)"] if panel_path else [])
+        scope = st.radio("Cakupan", scopes, horizontal=True, key=f"{key}_scope")
+
+        if scope == "Pilihan saat ini":
+            base = name
+            chunks = lambda: iter_frame(selection)
+        else:
+            # dibaca langsung dari file per chunk, tidak lewat frame di memori
+            base = panel_path
+            chunks = lambda: iter_file(panel_path)
+            # tombol di bawah tetap menampung file utuh di memori server Streamlit;
+            # query_api /export mengirim per blok tanpa salinan penuh
+            dataset = os.path.splitext(os.path.basename(PANEL_PATH))[0]
+            if QUERY_API_URL:
+                url = f"{QUERY_API_URL}/export/{dataset}?format={fmt}"
+                st.caption(f"File besar? Unduh langsung (streaming) dari query API: [{url}]({url})")
+            else:
+                st.caption(
+                    f"File besar? Jalankan `python query_api.py` lalu buka `/export/{dataset}?format={fmt}` "
+                    "(streaming, tidak lewat memori Streamlit)."
+                )
+
+        st.download_button(
+            "Unduh",
+            data=lambda: write_export(chunks(), fmt),
+            file_name=export_name(base, fmt),
+            mime=FORMATS[fmt][0],
+            on_click="ignore",
+            key=f"{key}_download",
+        )
+
+
+def _search_mask(df: pd.DataFrame, cols: list[str], query: str) -> np.ndarray:
+    mask = np.zeros(len(df), dtype=bool)
+    for c in cols:
+        mask |= df[c].astype("string").str.contains(query, case=False, regex=False, na=False).to_numpy()
+    return mask
+
+
+@st.fragment
+def paged_table(
+    df: pd.DataFrame,
+    key: str,
+    decimals: dict[str, int] | None = None,
+    search_cols: tuple[str, ...] = ("country", "iso3"),
+) -> None:
+    """
+    Tabel dengan filter, urutan dan halaman di sisi server (pandas).
+    Hanya baris halaman aktif yang dibulatkan (vektor, DataFrame.round) dan
+    dikirim ke browser; format angka dikerjakan grid lewat column_config.
+    `df` boleh frame cache read-only: tidak ada yang ditulis ke df.
+    """
+    decimals = {c: d for c, d in (decimals or {}).items() if c in df.columns}
+    search_cols = [c for c in search_cols if c in df.columns]
+    page_key = f"{key}_page"
+
+    def reset_page():
+        st.session_state[page_key] = 1
+
+    c1, c2, c3, c4 = st.columns([3, 2, 1, 1])
+    query = c1.text_input("Cari negara / iso3", key=f"{key}_query", on_change=reset_page).strip()
+    sort_col = c2.selectbox("Urutkan menurut", [NO_SORT] + list(df.columns), key=f"{key}_sort", on_change=reset_page)
+    desc = c3.toggle("Menurun", key=f"{key}_desc", on_change=reset_page)
+    size = c4.selectbox("Baris/halaman", PAGE_SIZES, index=1, key=f"{key}_size", on_change=reset_page)
+
+    view = df[_search_mask(df, search_cols, query)] if query and search_cols else df
+
+    # posisi baris hasil urut; NaN selalu di akhir
+    if sort_col != NO_SORT:
+        order = (
+            view[sort_col]
+            .reset_index(drop=True)
+            .sort_values(ascending=not desc, na_position="last", kind="stable")
+            .index.to_numpy()
+        )
+    else:
+        order = None
+
+    total = len(view)
+    n_pages = max(1, -(-total // size))
+    if st.session_state.get(page_key, 1) > n_pages:
+        st.session_state[page_key] = n_pages
+    page = st.number_input(f"Halaman (dari {n_pages:,})", min_value=1, max_value=n_pages, key=page_key)
+
+    start = (page - 1) * size
+    rows = view.iloc[start:start + size] if order is None else view.iloc[order[start:start + size]]
+
+    st.dataframe(
+        rows.round(decimals),
+        width="stretch",
+        hide_index=True,
+        column_config={c: st.column_config.NumberColumn(format=f"%.{d}f") for c, d in decimals.items()},
+    )
+    if total:
+        st.caption(f"Baris {start + 1:,}–{start + len(rows):,} dari {total:,}")
+    else:
+        st.caption("Tidak ada baris yang cocok.")
@@ -1,8 +1,14 @@
 import streamlit as st
 import pandas as pd
 import requests
+import threading
 from datetime import datetime
 
+import frame_cache
+import profiling
+import wb_spool
+from macro_panel import freeze
+
 # =========================
 # CONFIG: World Bank (WDI) indicators
 # =========================
@@ -24,6 +30,14 @@ INDICATORS = {
     },
 }
 
+# Weights for group aggregates (region / income group)
+WEIGHT_INDICATORS = {
+    "population": "SP.POP.TOTL",  # Population, total
+    "gdp": "NY.GDP.MKTP.CD",      # GDP (current US$)
+}
+
+GROUP_COLS = ["region", "income"]
+
 WB_COUNTRY_URL = "https://api.worldbank.org/v2/country"
 WB_IND_URL = "https://api.worldbank.org/v2/country/all/indicator/{code}"
 
@@ -32,11 +46,57 @@ HEADERS = {"User-Agent": "streamlit-women-dashboard/1.0"}
 # =========================
 # Helpers
 # =========================
-def _wb_get(url: str, params: dict):
+class _InFlight:
+    """One upstream request that other callers can wait on."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+# key -> request currently running (singleflight)
+_inflight: dict[tuple, _InFlight] = {}
+_inflight_lock = threading.Lock()
+
+def _singleflight(key: tuple, fn):
+    """
+    Run fn() once per key at a time; concurrent callers with the same key
+    wait for that call and get the same result (or the same exception).
+    """
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _InFlight()
+
+    if not leader:
+        call.done.wait()
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    try:
+        call.result = fn()
+        return call.result
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.done.set()
+
+def _http_get_json(url: str, params: dict):
     r = requests.get(url, params=params, headers=HEADERS, timeout=30)
     r.raise_for_status()
     return r.json()
 
+def _wb_get(url: str, params: dict):
+    # concurrent cold-cache sessions asking for the same (indicator, date, page)
+    # share one upstream request; the parsed JSON is shared read-only
+    key = (url, tuple(sorted((k, str(v)) for k, v in params.items())))
+    return _singleflight(key, lambda: _http_get_json(url, dict(params)))
+
+@profiling.track
 @st.cache_data(ttl=24 * 3600, show_spinner=False)
 def fetch_countries() -> pd.DataFrame:
     """
@@ -59,6 +119,13 @@ def fetch_countries() -> pd.DataFrame:
             )
     return pd.DataFrame(rows)
 
+def _spooled_pages(url: str, params: dict) -> list:
+    payloads = wb_spool.fetch_pages(url, params, _wb_get)
+    # all pages are in memory now -> checkpoints no longer needed
+    wb_spool.clear(url, params)
+    return payloads
+
+@profiling.track
 def fetch_indicator(code: str, start_year: int, end_year: int) -> pd.DataFrame:
     """
     Return: iso3, country, year, value
@@ -73,13 +140,16 @@ def fetch_indicator(code: str, start_year: int, end_year: int) -> pd.DataFrame:
 
     rows = []
 
-    js = _wb_get(url, params)
+    # every page is checkpointed in the spool; a rerun after a failed page
+    # only requests the pages that are still missing. Concurrent callers of the
+    # same request share one pull: only the singleflight leader writes and
+    # clears the spool folder.
+    key = ("spool", url, tuple(sorted((k, str(v)) for k, v in params.items())))
+    payloads = _singleflight(key, lambda: _spooled_pages(url, params))
+    js = payloads[0]
     if not isinstance(js, list) or len(js) < 2:
         return pd.DataFrame(columns=["iso3", "country", "year", "value"])
 
-    meta = js[0] if isinstance(js[0], dict) else {}
-    pages = int(meta.get("pages") or 1)
-
     def _consume(items):
         if not isinstance(items, list):
             return
@@ -101,12 +171,7 @@ def fetch_indicator(code: str, start_year: int, end_year: int) -> pd.DataFrame:
 
             rows.append({"iso3": iso3, "country": country, "year": year_int, "value": val})
 
-    _consume(js[1])
-
-    # pagination
-    for p in range(2, pages + 1):
-        params["page"] = p
-        js_p = _wb_get(url, params)
+    for js_p in payloads:
         if isinstance(js_p, list) and len(js_p) >= 2:
             _consume(js_p[1])
 
@@ -118,11 +183,24 @@ def fetch_indicator(code: str, start_year: int, end_year: int) -> pd.DataFrame:
     df = df.dropna(subset=["value"]).reset_index(drop=True)
     return df
 
-@st.cache_data(ttl=24 * 3600, show_spinner=True)
+def _end_year(end_year: int | None) -> int:
+    return datetime.now().year if end_year is None else end_year
+
+
+@profiling.track
 def load_all_data(start_year: int = 1990, end_year: int | None = None) -> pd.DataFrame:
-    if end_year is None:
-        end_year = datetime.now().year
+    # end_year di-resolve sebelum jadi kunci cache: load_all_data() dan
+    # load_all_data(1990, <tahun ini>) memakai entri yang sama
+    return _cached_all_data(start_year, _end_year(end_year))
+
 
+@frame_cache.cached(ttl=24 * 3600)
+def _cached_all_data(start_year: int, end_year: int) -> pd.DataFrame:
+    with st.spinner("Memuat data World Bank..."):
+        return freeze(_load_all_data(start_year, end_year))
+
+
+def _load_all_data(start_year: int, end_year: int) -> pd.DataFrame:
     countries = fetch_countries()
 
     frames = []
@@ -141,28 +219,91 @@ def load_all_data(start_year: int = 1990, end_year: int | None = None) -> pd.Dat
     df = pd.concat(frames, ignore_index=True)
 
     # --- HARDEN: ensure iso3 exists (single source of truth)
-if "iso3" not in df.columns:
-    if "countryiso3code" in df.columns:
-        df = df.rename(columns={"countryiso3code": "iso3"})
-    elif "Country Code" in df.columns:
-        df = df.rename(columns={"Country Code": "iso3"})
-    else:
-        # fail early with clear message
-        raise KeyError(
-            f"'iso3' not found. Available columns: {list(df.columns)}"
-        )
-
-
-# merge pakai iso3 saja
-df = df.merge(
-    countries[["iso3", "region", "income", "lending"]],
-    on="iso3",
-    how="left"
-)
+    if "iso3" not in df.columns:
+        if "countryiso3code" in df.columns:
+            df = df.rename(columns={"countryiso3code": "iso3"})
+        elif "Country Code" in df.columns:
+            df = df.rename(columns={"Country Code": "iso3"})
+        else:
+            # fail early with clear message
+            raise KeyError(
+                f"'iso3' not found. Available columns: {list(df.columns)}"
+            )
 
+    # merge pakai iso3 saja
+    df = df.merge(
+        countries[["iso3", "region", "income", "lending"]],
+        on="iso3",
+        how="left"
+    )
 
     return df
 
+def compute_group_aggregates(df: pd.DataFrame, weights: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Aggregate load_all_data() output per region and per income group, per year and indicator.
+    weights: iso3, year, population, gdp (optional) -> population- / GDP-weighted means.
+    Return: group_type, group, year, indicator, indicator_code, unit,
+            n_countries, mean, population_weighted_mean, gdp_weighted_mean
+    """
+    cols = ["group_type", "group", "year", "indicator", "indicator_code", "unit", "n_countries", "mean"]
+    cols += [f"{w}_weighted_mean" for w in WEIGHT_INDICATORS]
+    if df.empty:
+        return pd.DataFrame(columns=cols)
+
+    d = df.dropna(subset=["value"])
+    if weights is not None and not weights.empty:
+        d = d.merge(weights, on=["iso3", "year"], how="left")
+    for w in WEIGHT_INDICATORS:
+        if w not in d.columns:
+            d[w] = float("nan")
+        # only rows with both value and weight count towards the weighted mean
+        d[f"_{w}_x"] = d["value"] * d[w]
+
+    key = ["group", "year", "indicator", "indicator_code", "unit"]
+    spec = {"n_countries": ("value", "count"), "mean": ("value", "mean")}
+    for w in WEIGHT_INDICATORS:
+        spec[f"_{w}_x"] = (f"_{w}_x", "sum")
+        spec[f"_{w}_w"] = (f"_{w}_w", "sum")
+
+    out = []
+    for gtype in GROUP_COLS:
+        # "Aggregates" = World Bank aggregate economies (World, EAP, ...), not countries
+        g = d[d[gtype].notna() & (d[gtype] != "Aggregates")].rename(columns={gtype: "group"})
+        g = g.assign(**{f"_{w}_w": g[w].where(g[f"_{w}_x"].notna()) for w in WEIGHT_INDICATORS})
+        a = g.groupby(key, as_index=False).agg(**spec)
+        for w in WEIGHT_INDICATORS:
+            denom = a[f"_{w}_w"].where(a[f"_{w}_w"] > 0)
+            a[f"{w}_weighted_mean"] = a[f"_{w}_x"] / denom
+        a["group_type"] = gtype
+        out.append(a[cols])
+
+    return pd.concat(out, ignore_index=True)
+
+@profiling.track
+def load_group_aggregates(start_year: int = 1990, end_year: int | None = None) -> pd.DataFrame:
+    """
+    Region / income-group benchmarks for INDICATORS, computed locally.
+    Cached in frame_cache for 24h, keyed on the resolved (start_year, end_year);
+    the underlying load_all_data() call shares that key, so a warm one is reused.
+    """
+    return _cached_group_aggregates(start_year, _end_year(end_year))
+
+
+@frame_cache.cached(ttl=24 * 3600)
+def _cached_group_aggregates(start_year: int, end_year: int) -> pd.DataFrame:
+    df = load_all_data(start_year, end_year)
+
+    weights = None
+    for name, code in WEIGHT_INDICATORS.items():
+        w = fetch_indicator(code, start_year, end_year)
+        if w.empty:
+            continue
+        w = w[["iso3", "year", "value"]].rename(columns={"value": name})
+        weights = w if weights is None else weights.merge(w, on=["iso3", "year"], how="outer")
+
+    return freeze(compute_group_aggregates(df, weights))
+
 def sidebar_nav():
     st.sidebar.markdown("## 💗 Women Dashboard")
     st.sidebar.page_link("app.py", label="💗 Description")
@@ -0,0 +1,118 @@
+"""
+Checkpointed (resumable) pagination for World Bank API pulls.
+
+Every fetched page is written to a local spool as
+  <WB_SPOOL_DIR>/<fingerprint>/page_<n>.json
+where fingerprint = hash of the URL + query params (without the page number).
+If a pull dies halfway, the next run reads the pages already on disk and only
+requests the missing ones. Call clear() once the final frame is assembled.
+
+A spool is only resumed while its page 1 (which fixes the page count) is
+younger than WB_SPOOL_MAX_AGE seconds (default 6 h); older spools are thrown
+away so a failed pull does not mix stale pages into a later one.
+Writers in one process should be coalesced by the caller (utils_wb runs one
+fetch_pages + clear per request via its singleflight); page writes use unique
+temp files and tolerate the folder being removed underneath them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable
+
+SPOOL_DIR = os.environ.get("WB_SPOOL_DIR", ".wb_spool")
+MAX_AGE = float(os.environ.get("WB_SPOOL_MAX_AGE", 6 * 3600))
+
+
+def fingerprint(url: str, params: dict) -> str:
+    req = {k: str(v) for k, v in params.items() if k != "page"}
+    raw = json.dumps({"url": url, "params": req}, sort_keys=True)
+    return hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def _page_path(folder: str, page: int) -> str:
+    return os.path.join(folder, f"page_{page}.json")
+
+
+def _write_atomic(path: str, payload) -> None:
+    """Best-effort checkpoint: a failed write only means the page is fetched again."""
+    folder = os.path.dirname(path)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f)
+        os.replace(tmp, path)
+    except OSError:
+        # folder cleared concurrently (e.g. another process finished the same pull)
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+def _is_stale(folder: str, max_age: float) -> bool:
+    """Spool without a page 1, or whose page 1 is older than max_age."""
+    try:
+        return time.time() - os.path.getmtime(_page_path(folder, 1)) > max_age
+    except OSError:
+        return True
+
+
+def _read(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # missing or half-written page -> fetch again
+        return None
+
+
+def _is_data_page(js) -> bool:
+    """World Bank data page: [meta with "pages", items]."""
+    return isinstance(js, list) and len(js) >= 2 and isinstance(js[0], dict) and "pages" in js[0]
+
+
+def fetch_pages(
+    url: str,
+    params: dict,
+    get_json: Callable[[str, dict], object],
+    spool_dir: str | None = None,
+    max_age: float | None = None,
+) -> list:
+    """
+    Return the JSON payload of every page ([meta, items] each), page 1 first.
+    Pages found in a fresh spool are not requested again.
+    """
+    folder = os.path.join(spool_dir or SPOOL_DIR, fingerprint(url, params))
+    if os.path.isdir(folder) and _is_stale(folder, MAX_AGE if max_age is None else max_age):
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def _page(p: int):
+        path = _page_path(folder, p)
+        js = _read(path)
+        if not _is_data_page(js):
+            js = get_json(url, {**params, "page": p})
+            # error bodies ([{"message": ...}], HTTP 200) are returned, never spooled
+            if _is_data_page(js):
+                _write_atomic(path, js)
+        return js
+
+    first = _page(1)
+    meta = first[0] if isinstance(first, list) and first and isinstance(first[0], dict) else {}
+    pages = int(meta.get("pages") or 1)
+
+    return [first] + [_page(p) for p in range(2, pages + 1)]
+
+
+def clear(url: str, params: dict, spool_dir: str | None = None) -> None:
+    """Drop the spool of one request (after its frame has been assembled); missing is fine."""
+    shutil.rmtree(os.path.join(spool_dir or SPOOL_DIR, fingerprint(url, params)), ignore_errors=True)